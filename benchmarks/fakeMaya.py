@@ -0,0 +1,259 @@
+"""Local stand-in for Maya's Python command port.
+
+Speaks the same plain-text protocol as a port opened with
+maya.cmds.commandPort(name=..., stp='python', echoOutput=True): every line
+read from the socket is evaluated as one Python expression and the result
+is sent back terminated by a null byte. Commands are executed one at a time,
+like on Maya's main thread, against a fake maya.cmds which records time
+slider and playback option changes. Latency, jitter and failures can be
+injected per command.
+
+Commands are evaluated with eval, so the server only listens on localhost.
+
+Usage:
+    python -m benchmarks.fakeMaya --port 7221 --latency 2 --jitter 1
+"""
+import time
+import types
+import random
+import asyncio
+import logging
+import argparse
+import threading
+import collections
+
+# Logger
+logger = logging.getLogger(__name__)
+
+FAILURE_MODES = ("error", "silent", "disconnect")
+
+
+class FakeCmds(object):
+    """Subset of maya.cmds used by the player, records every call."""
+
+    def __init__(self):
+        self.time = 0.0
+        self.unit = "film"
+        self.options = {}
+        self.calls = collections.Counter()
+        self.timeHistory = []
+
+    def currentTime(self, *args, **kwargs):
+        self.calls["currentTime"] += 1
+        if kwargs.get("query") or kwargs.get("q"):
+            return self.time
+        value = args[0] if args else kwargs.get("time", kwargs.get("t"))
+        if value is not None:
+            self.time = float(value)
+            self.timeHistory.append(self.time)
+        return self.time
+
+    def currentUnit(self, *args, **kwargs):
+        self.calls["currentUnit"] += 1
+        if kwargs.get("query") or kwargs.get("q"):
+            return self.unit
+        self.unit = kwargs.get("time", kwargs.get("t", self.unit))
+        return None
+
+    def playbackOptions(self, *args, **kwargs):
+        self.calls["playbackOptions"] += 1
+        if kwargs.get("query") or kwargs.get("q"):
+            return [
+                self.options.get(key) for key in kwargs
+                if key not in ("query", "q")]
+        for key, value in kwargs.items():
+            if key not in ("edit", "e"):
+                self.options[key] = value
+        return None
+
+    def __getattr__(self, name):
+        # Any other command succeeds and returns nothing
+        if name.startswith("_"):
+            raise AttributeError(name)
+
+        def command(*args, **kwargs):
+            self.calls[name] += 1
+            return None
+        return command
+
+
+class FakeMayaServer(object):
+    """Command port server running on its own thread.
+
+    Args:
+        port (int, optional): Port to listen on, 0 picks a free one (see port
+            after start).
+        host (str, optional): Interface to listen on.
+        latency (float, optional): Milliseconds every command takes to execute.
+        jitter (float, optional): Max random milliseconds added to or removed
+            from latency.
+        failureRate (float, optional): Probability of a command failing.
+        failureMode (str, optional): How commands fail: "error" replies with an
+            error, "silent" never replies, "disconnect" drops the connection.
+        seed (int, optional): Random seed, for reproducible jitter and
+            failures.
+    """
+
+    def __init__(self, port=0, host="127.0.0.1", latency=0.0, jitter=0.0,
+                 failureRate=0.0, failureMode="error", seed=None):
+        if failureMode not in FAILURE_MODES:
+            raise ValueError(
+                "Unknown failure mode {0}, expected one of {1}".format(
+                    failureMode, FAILURE_MODES))
+        self.port = port
+        self.host = host
+        self.latency = latency
+        self.jitter = jitter
+        self.failureRate = failureRate
+        self.failureMode = failureMode
+        self.cmds = FakeCmds()
+        self.commands = 0
+        self.failures = 0
+        self.connections = 0
+        self._random = random.Random(seed)
+        self._loop = None
+        self._thread = None
+        self._server = None
+        self._executeLock = None
+        # Writer of every open connection
+        self._connections = set()
+
+    def start(self):
+        """Start listening, returns once the server accepts connections."""
+        ready = threading.Event()
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(
+            target=self._run, args=(ready,), name="FakeMaya", daemon=True)
+        self._thread.start()
+        ready.wait()
+        return self
+
+    def stop(self):
+        if self._loop is None:
+            return
+        asyncio.run_coroutine_threadsafe(self._close(), self._loop).result()
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join()
+        self._loop = None
+        self._thread = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *args):
+        self.stop()
+
+    def namespace(self):
+        maya = types.SimpleNamespace(cmds=self.cmds)
+        return {"maya": maya, "cmds": self.cmds}
+
+    def execute(self, command):
+        """Evaluate command like Maya's Python command port.
+
+        Returns:
+            str: Reply text without terminator.
+        """
+        try:
+            result = eval(command, self.namespace())
+        except Exception as e:
+            return "# Error: {0}: {1}\n".format(type(e).__name__, e)
+        return ("" if result is None else str(result)) + "\n"
+
+    def _run(self, ready):
+        asyncio.set_event_loop(self._loop)
+        self._executeLock = asyncio.Lock()
+        self._server = self._loop.run_until_complete(
+            asyncio.start_server(self._handle, self.host, self.port))
+        self.port = self._server.sockets[0].getsockname()[1]
+        ready.set()
+        self._loop.run_forever()
+        self._loop.close()
+
+    async def _close(self):
+        self._server.close()
+        # Closing connections ends their handlers once they are done with
+        # current command
+        handlers = []
+        for writer, handler in list(self._connections):
+            writer.close()
+            handlers.append(handler)
+        await asyncio.gather(*handlers, return_exceptions=True)
+        await self._server.wait_closed()
+
+    async def _handle(self, reader, writer):
+        self.connections += 1
+        connection = (writer, asyncio.current_task())
+        self._connections.add(connection)
+        try:
+            while True:
+                try:
+                    data = await reader.readuntil(b"\n")
+                except asyncio.IncompleteReadError:
+                    break
+                # Maya runs one command at a time on its main thread
+                async with self._executeLock:
+                    reply = await self._process(data.decode().rstrip("\n"))
+                if reply is False or writer.is_closing():
+                    break
+                if reply is not None:
+                    writer.write(reply.encode() + b"\x00")
+                    await writer.drain()
+        except (ConnectionError, asyncio.LimitOverrunError):
+            pass
+        finally:
+            self._connections.discard(connection)
+            writer.close()
+
+    async def _process(self, command):
+        """Reply to command, None for no reply and False to drop connection."""
+        self.commands += 1
+        delay = self.latency + self._random.uniform(-self.jitter, self.jitter)
+        if delay > 0:
+            await asyncio.sleep(delay / 1000)
+        if self.failureRate and self._random.random() < self.failureRate:
+            self.failures += 1
+            if self.failureMode == "silent":
+                return None
+            if self.failureMode == "disconnect":
+                return False
+            return "# Error: Injected failure\n"
+        return self.execute(command)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Fake Maya Python command port.")
+    parser.add_argument("--port", type=int, default=7221)
+    parser.add_argument(
+        "--latency", type=float, default=0.0, help="Milliseconds per command.")
+    parser.add_argument(
+        "--jitter", type=float, default=0.0,
+        help="Max random milliseconds added to latency.")
+    parser.add_argument(
+        "--failure-rate", type=float, default=0.0,
+        help="Probability of a command failing.")
+    parser.add_argument(
+        "--failure-mode", choices=FAILURE_MODES, default="error")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO)
+    server = FakeMayaServer(
+        args.port, latency=args.latency, jitter=args.jitter,
+        failureRate=args.failure_rate, failureMode=args.failure_mode).start()
+    logger.info(
+        f"Fake Maya listening on {server.host}:{server.port}, press Ctrl+C "
+        "to stop")
+    try:
+        while True:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.stop()
+        logger.info(
+            f"Executed {server.commands} commands ({server.failures} "
+            f"failed), current time {server.cmds.time}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,197 @@
+"""Load test of Maya time slider sync.
+
+Drives MayaClient through SyncDispatcher the way playback does, submitting
+one frame per frame interval at each chosen frame rate, against the fake
+command port server (or a real Maya with --port). Reports achieved
+throughput, dropped and failed frames and round-trip latency percentiles
+as JSON.
+
+Usage:
+    python -m benchmarks.syncBenchmark --rates 24 60 120 --latency 3 --jitter 2
+"""
+import sys
+import json
+import time
+import argparse
+import datetime
+import platform
+import fractions
+from scripts.mayaClient import MayaClient
+from scripts.syncDispatcher import SyncDispatcher
+from scripts.playbackClock import PlaybackClock
+from benchmarks.fakeMaya import FakeMayaServer, FAILURE_MODES
+
+RATES = ("24", "30000/1001", "60", "120")
+SECONDS = 10.0
+# Seconds to wait for commands in flight after the last frame
+DRAIN_TIMEOUT = 5.0
+
+
+def runRate(client, frameRate, seconds=SECONDS,
+            maxInFlight=SyncDispatcher.MAX_IN_FLIGHT, server=None):
+    """Sync frames at frameRate for given number of seconds.
+
+    Args:
+        client (MayaClient): Connected client, its stats are reset.
+        frameRate (Fraction): Frames submitted per second.
+        seconds (float, optional): Length of the run.
+        maxInFlight (int, optional): Dispatcher window.
+        server (FakeMayaServer, optional): Fake server, used to check frame
+            Maya ended on.
+
+    Returns:
+        dict: Results of the run.
+    """
+    client.stats.reset()
+    connectionLost = []
+    dispatcher = SyncDispatcher(
+        client, onError=lambda: connectionLost.append(time.perf_counter()),
+        maxInFlight=maxInFlight)
+    dispatcher.start()
+
+    frames = int(seconds * frameRate)
+    clock = PlaybackClock(frameRate)
+    clock.start(0)
+    late = 0
+    for frame in range(frames):
+        delay = clock.timeOfFrame(frame) - clock.now()
+        if delay > 0:
+            time.sleep(delay / 1e9)
+        elif delay < -1e9 / frameRate:
+            # Submitting fell behind by more than a frame
+            late += 1
+        dispatcher.submit(frame)
+    submitSeconds = (clock.now() - clock.originTime) / 1e9
+
+    # Let last frames arrive before reading counters
+    deadline = time.perf_counter() + DRAIN_TIMEOUT
+    while not dispatcher.isIdle() and time.perf_counter() < deadline:
+        time.sleep(0.01)
+    elapsed = (clock.now() - clock.originTime) / 1e9
+    dispatcher.stop()
+
+    stats = client.stats.snapshot()
+    result = {"frameRate": str(frameRate),
+              "seconds": elapsed,
+              "submitted": frames,
+              "submittedLate": late,
+              "submitFps": frames / submitSeconds if submitSeconds else None,
+              "sent": stats["sent"],
+              "dropped": stats["dropped"],
+              "failed": stats["failed"],
+              "connectionLost": len(connectionLost),
+              "replies": stats["replies"],
+              "throughput": stats["replies"] / elapsed if elapsed else None,
+              "dropRate": stats["dropped"] / frames if frames else None,
+              "rttMean": stats["rttMean"],
+              "rttP50": stats["rttP50"],
+              "rttP95": stats["rttP95"],
+              "rttP99": stats["rttP99"],
+              "rttMax": stats["rttMax"],
+              "bytesIn": stats["bytesIn"],
+              "bytesOut": stats["bytesOut"]}
+    if server is not None:
+        # Latest-wins sync must always leave Maya on the last frame
+        result["mayaFinalFrame"] = server.cmds.time
+        result["finalFrameSynced"] = server.cmds.time == frames - 1
+    return result
+
+
+def run(rates, seconds=SECONDS, maxInFlight=SyncDispatcher.MAX_IN_FLIGHT,
+        port=None, serverOptions=None, progress=None):
+    """Run load test at every frame rate.
+
+    Args:
+        rates (list): Frame rates as Fractions.
+        port (int, optional): Port of running Maya, fake server is started if
+            not set.
+        serverOptions (dict, optional): FakeMayaServer keyword arguments.
+
+    Returns:
+        list: Result of every rate.
+    """
+    server = None
+    if port is None:
+        server = FakeMayaServer(**(serverOptions or {})).start()
+        port = server.port
+    client = MayaClient(port=port)
+    try:
+        if not client.connect():
+            raise IOError("Failed to connect to command port {0}".format(port))
+        results = []
+        for rate in rates:
+            if progress:
+                progress(rate)
+            results.append(runRate(client, rate, seconds, maxInFlight, server))
+        return results
+    finally:
+        client.close()
+        if server is not None:
+            server.stop()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Load test Maya time slider sync.")
+    parser.add_argument(
+        "--rates", nargs="+", default=list(RATES),
+        help="Frame rates, for example 24 or 24000/1001.")
+    parser.add_argument(
+        "--seconds", type=float, default=SECONDS,
+        help="Length of run at every rate.")
+    parser.add_argument(
+        "--max-in-flight", type=int, default=SyncDispatcher.MAX_IN_FLIGHT)
+    parser.add_argument(
+        "--port", type=int,
+        help="Test against Maya on this port instead of fake server.")
+    parser.add_argument(
+        "--latency", type=float, default=0.0,
+        help="Fake server milliseconds per command.")
+    parser.add_argument(
+        "--jitter", type=float, default=0.0,
+        help="Fake server max random milliseconds added to latency.")
+    parser.add_argument(
+        "--failure-rate", type=float, default=0.0,
+        help="Fake server probability of a command failing.")
+    parser.add_argument(
+        "--failure-mode", choices=FAILURE_MODES, default="error")
+    parser.add_argument("--seed", type=int, help="Fake server random seed.")
+    parser.add_argument(
+        "--output", default="syncBenchmarkResults.json",
+        help="JSON file to write results to.")
+    args = parser.parse_args(argv)
+
+    serverOptions = {"latency": args.latency,
+                     "jitter": args.jitter,
+                     "failureRate": args.failure_rate,
+                     "failureMode": args.failure_mode,
+                     "seed": args.seed}
+    rates = [fractions.Fraction(rate) for rate in args.rates]
+    results = run(
+        rates, args.seconds, args.max_in_flight, args.port, serverOptions,
+        progress=lambda rate: print(
+            f"Syncing at {float(rate):.3f} fps...", file=sys.stderr))
+
+    date = datetime.datetime.now().isoformat(timespec="seconds")
+    environment = {"python": platform.python_version(),
+                   "platform": platform.platform()}
+    target = "maya:{0}".format(args.port) if args.port else "fake"
+    with open(args.output, "w") as jsonFile:
+        json.dump({"date": date,
+                   "environment": environment,
+                   "target": target,
+                   "server": None if args.port else serverOptions,
+                   "maxInFlight": args.max_in_flight,
+                   "results": results}, jsonFile, indent=4)
+    for result in results:
+        summary = ("{0} fps: {1:.1f} replies/s, dropped {2}, failed {3}, "
+                   "RTT p50 {4} ms, p99 {5} ms").format(
+            result["frameRate"], result["throughput"] or 0,
+            result["dropped"], result["failed"],
+            result["rttP50"], result["rttP99"])
+        print(summary, file=sys.stderr)
+    print(f"Results written to {args.output}", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,289 @@
+"""Benchmarks of video probing, frame counting and frame/time mapping.
+
+Synthetic videos are generated locally with cv2.VideoWriter for every
+combination of resolution, length and codec, so runs on different machines
+measure the same material. Results are written as JSON to be compared
+between runs.
+
+Usage:
+    python -m benchmarks.videoBenchmark --output benchmarkResults.json
+"""
+import os
+import sys
+import json
+import time
+import array
+import shutil
+import argparse
+import platform
+import datetime
+import tempfile
+import fractions
+import statistics
+import numpy
+import cv2
+from scripts import videoFn
+from scripts.frameReader import VideoFrameReader
+from scripts.referenceSyncEngine import VideoMeta
+
+RESOLUTIONS = {"360p": (640, 360),
+               "720p": (1280, 720),
+               "1080p": (1920, 1080)}
+# Frames
+LENGTHS = (48, 480, 2400)
+# (fourcc, container extension), MKV does not store frame count, so OpenCV has
+# to estimate it
+CODECS = (("MJPG", ".avi"),
+          ("XVID", ".avi"),
+          ("mp4v", ".mp4"),
+          ("mp4v", ".mkv"))
+FRAME_RATE = fractions.Fraction(24000, 1001)
+REPEAT = 5
+
+
+def generateVideo(filePath, fourcc, resolution, frames, frameRate=FRAME_RATE):
+    """Write synthetic video of moving gradient.
+
+    Returns:
+        bool: False if codec or container is not supported by OpenCV build.
+    """
+    width, height = resolution
+    writer = cv2.VideoWriter(
+        filePath, cv2.VideoWriter_fourcc(*fourcc), float(frameRate),
+        (width, height))
+    if not writer.isOpened():
+        return False
+    gradient = numpy.tile(numpy.arange(width, dtype=numpy.uint16), (height, 1))
+    image = numpy.empty((height, width, 3), dtype=numpy.uint8)
+    try:
+        for frame in range(frames):
+            # Every frame differs, so encoders can't skip any of them
+            image[:, :, 0] = (gradient + frame * 4) % 256
+            image[:, :, 1] = frame % 256
+            image[:, :, 2] = 255 - image[:, :, 0]
+            writer.write(image)
+    finally:
+        writer.release()
+    return os.path.isfile(filePath) and os.path.getsize(filePath) > 0
+
+
+def metadataFrameCount(filePath):
+    """Frame count stored in the container, None if missing."""
+    if videoFn.av is not None:
+        with videoFn.av.open(filePath) as container:
+            return container.streams.video[0].frames or None
+    capture = cv2.VideoCapture(filePath)
+    try:
+        frames = int(capture.get(cv2.CAP_PROP_FRAME_COUNT))
+    finally:
+        capture.release()
+    return frames if frames > 0 else None
+
+
+def timeCall(function, repeat=REPEAT):
+    """Run function repeat times.
+
+    Returns:
+        tuple: (timings dict in seconds, result of the last call).
+    """
+    timings = []
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = function()
+        timings.append(time.perf_counter() - start)
+    summary = {"min": min(timings),
+               "median": statistics.median(timings),
+               "mean": statistics.mean(timings)}
+    return summary, result
+
+
+def readFirstFrame(filePath):
+    reader = VideoFrameReader(filePath)
+    try:
+        return reader.read(0) is not None
+    finally:
+        reader.close()
+
+
+def countFramesFallback(filePath):
+    """Count frames the way missing frame count metadata is handled."""
+    if videoFn.av is None:
+        return videoFn.countDecodedFrames(filePath)
+    return videoFn.countPackets(filePath)
+
+
+def mappingVariants(filePath, meta):
+    """Video meta structs for every frame/time mapping path.
+
+    Returns:
+        dict: Name to VideoMeta, constant rate math, timestamp index and
+            duration fallback.
+    """
+    frameCount = meta["frameCount"]
+    frameRate = FRAME_RATE
+    if meta["frameRate"]:
+        frameRate = fractions.Fraction(meta["frameRate"])
+    timestamps = meta["timestamps"]
+    if timestamps is None:
+        frameDuration = 1000000 * frameRate.denominator
+        timestamps = array.array(
+            "q", (frame * frameDuration // frameRate.numerator
+                  for frame in range(frameCount)))
+
+    variants = {}
+    for name, rate, index in (("constantRate", frameRate, None),
+                              ("timestampIndex", frameRate, timestamps),
+                              ("durationFallback", None, None)):
+        videoMeta = VideoMeta()
+        videoMeta.path = filePath
+        videoMeta.frameCount = frameCount
+        videoMeta.frameRate = rate
+        videoMeta.timestamps = index
+        videoMeta.duration = float(frameCount / frameRate)
+        variants[name] = videoMeta
+    return variants
+
+
+def benchmarkMapping(videoMeta, repeat=REPEAT):
+    """Time frame/time mapping over the whole timeline.
+
+    positionToFrame is called for every millisecond and frameToPosition for
+    every frame.
+
+    Returns:
+        dict: Timings per whole timeline and nanoseconds per call.
+    """
+    positions = range(int(videoMeta.duration * 1000))
+    frames = range(videoMeta.frameCount)
+
+    def toFrames():
+        return [videoMeta.positionToFrame(position) for position in positions]
+
+    def toPositions():
+        return [videoMeta.frameToPosition(frame) for frame in frames]
+
+    positionTimings, _ = timeCall(toFrames, repeat)
+    frameTimings, mapped = timeCall(toPositions, repeat)
+    # Every frame has to map back to itself through its first millisecond
+    roundTrip = all(
+        videoMeta.positionToFrame(position) == frame
+        for frame, position in zip(frames, mapped))
+    positionCalls = max(1, len(positions))
+    frameCalls = max(1, len(frames))
+    return {"positionToFrame": positionTimings,
+            "positionToFrameNsPerCall":
+                positionTimings["median"] * 1e9 / positionCalls,
+            "frameToPosition": frameTimings,
+            "frameToPositionNsPerCall":
+                frameTimings["median"] * 1e9 / frameCalls,
+            "roundTrip": roundTrip}
+
+
+def benchmarkVideo(filePath, repeat=REPEAT):
+    """Run all benchmarks on a single video."""
+    result = {"fileSize": os.path.getsize(filePath),
+              "metadataFrameCount": metadataFrameCount(filePath)}
+
+    # Same as Window.getFrames
+    result["countFrames"], result["countedFrames"] = timeCall(
+        lambda: videoFn.countFrames(filePath), repeat)
+    result["countFramesFallback"], result["fallbackCountedFrames"] = timeCall(
+        lambda: countFramesFallback(filePath), repeat)
+    result["firstFrame"], _ = timeCall(
+        lambda: readFirstFrame(filePath), repeat)
+    result["probe"], meta = timeCall(lambda: videoFn.probe(filePath), repeat)
+    result["probedFrameCount"] = meta["frameCount"]
+    result["mapping"] = {
+        name: benchmarkMapping(videoMeta, repeat)
+        for name, videoMeta in mappingVariants(filePath, meta).items()}
+    return result
+
+
+def environment():
+    return {"python": platform.python_version(),
+            "platform": platform.platform(),
+            "processor": platform.processor(),
+            "cpuCount": os.cpu_count(),
+            "opencv": cv2.__version__,
+            "pyav": videoFn.av.__version__ if videoFn.av is not None else None,
+            "numpy": numpy.__version__}
+
+
+def run(directory, resolutions, lengths, codecs, repeat=REPEAT, progress=None):
+    """Generate videos in directory and benchmark them.
+
+    Returns:
+        list: Result dict of every generated video, unsupported codecs are
+            marked as skipped.
+    """
+    results = []
+    for resolutionName in resolutions:
+        for frames in lengths:
+            for fourcc, extension in codecs:
+                name = f"{resolutionName}_{frames}_{fourcc}{extension}"
+                entry = {"name": name,
+                         "resolution": RESOLUTIONS[resolutionName],
+                         "frames": frames,
+                         "codec": fourcc,
+                         "container": extension[1:],
+                         "frameRate": str(FRAME_RATE)}
+                filePath = os.path.join(directory, name)
+                if progress:
+                    progress(name)
+                generated = os.path.isfile(filePath) or generateVideo(
+                    filePath, fourcc, RESOLUTIONS[resolutionName], frames)
+                if not generated:
+                    entry["skipped"] = "Codec is not supported by OpenCV build"
+                else:
+                    entry.update(benchmarkVideo(filePath, repeat))
+                results.append(entry)
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Benchmark video probing, frame counting and frame/time "
+                    "mapping.")
+    parser.add_argument(
+        "--output", default="benchmarkResults.json",
+        help="JSON file to write results to.")
+    parser.add_argument(
+        "--repeat", type=int, default=REPEAT,
+        help="Runs of every measurement.")
+    parser.add_argument(
+        "--resolutions", nargs="+", choices=list(RESOLUTIONS),
+        default=list(RESOLUTIONS))
+    parser.add_argument(
+        "--lengths", nargs="+", type=int, default=list(LENGTHS),
+        help="Video lengths in frames.")
+    parser.add_argument(
+        "--directory",
+        help="Keep generated videos in this directory and reuse them on next "
+             "runs.")
+    args = parser.parse_args(argv)
+
+    directory = args.directory or tempfile.mkdtemp(
+        prefix="dsReferencePlayerBenchmark")
+    os.makedirs(directory, exist_ok=True)
+    try:
+        results = run(
+            directory, args.resolutions, args.lengths, CODECS,
+            repeat=args.repeat,
+            progress=lambda name: print(
+                f"Benchmarking {name}...", file=sys.stderr))
+    finally:
+        if not args.directory:
+            shutil.rmtree(directory, ignore_errors=True)
+
+    with open(args.output, "w") as jsonFile:
+        date = datetime.datetime.now().isoformat(timespec="seconds")
+        json.dump({"date": date,
+                   "environment": environment(),
+                   "repeat": args.repeat,
+                   "results": results}, jsonFile, indent=4)
+    print(f"Results written to {args.output}", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+import bisect
+from PySide2 import QtWidgets, QtGui, QtCore
+
+
+class Filmstrip(QtWidgets.QWidget):
+    """Strip of video thumbnails covering current frame range.
+
+    Thumbnails can arrive in any order, every slot of the strip shows the
+    available thumbnail closest to the frame under it, so strip fills in
+    progressively.
+
+    Args:
+        height (int, optional): Strip height in pixels.
+        parent (QWidget, optional): Parent widget.
+    """
+    frameClicked = QtCore.Signal(int)
+
+    def __init__(self, height=48, parent=None):
+        super(Filmstrip, self).__init__(parent)
+        self.setFixedHeight(height)
+        self.setSizePolicy(
+            QtWidgets.QSizePolicy.Expanding, QtWidgets.QSizePolicy.Fixed)
+        self.rangeStart = 0
+        self.rangeEnd = 0
+        self.clear()
+
+    def clear(self):
+        self.frames = []
+        self.thumbnails = {}
+        self.update()
+
+    def setRange(self, start, end):
+        self.rangeStart = start
+        self.rangeEnd = end
+        self.update()
+
+    def addThumbnail(self, frame, image):
+        if frame not in self.thumbnails:
+            bisect.insort(self.frames, frame)
+        self.thumbnails[frame] = image
+        self.update()
+
+    def nearestThumbnail(self, frame):
+        index = bisect.bisect_left(self.frames, frame)
+        candidates = self.frames[max(0, index - 1):index + 1]
+        if not candidates:
+            return None
+        return self.thumbnails[min(candidates, key=lambda x: abs(x - frame))]
+
+    def frameAt(self, x):
+        if self.width() <= 0:
+            return self.rangeStart
+        span = self.rangeEnd - self.rangeStart
+        return self.rangeStart + span * x // self.width()
+
+    def paintEvent(self, event):
+        painter = QtGui.QPainter(self)
+        painter.fillRect(self.rect(), QtGui.QColor(25, 25, 25))
+        if not self.frames:
+            return
+
+        sample = self.thumbnails[self.frames[0]]
+        slotWidth = max(
+            1, sample.width() * self.height() // max(1, sample.height()))
+        for x in range(0, self.width(), slotWidth):
+            image = self.nearestThumbnail(self.frameAt(x + slotWidth // 2))
+            painter.drawImage(
+                QtCore.QRect(x, 0, slotWidth, self.height()), image)
+
+    def mousePressEvent(self, event):
+        if (event.button() == QtCore.Qt.LeftButton
+                and self.rangeEnd > self.rangeStart):
+            self.frameClicked.emit(self.frameAt(event.pos().x()))
+        super(Filmstrip, self).mousePressEvent(event)
@@ -0,0 +1,83 @@
+import threading
+import collections
+
+
+class FrameCache(object):
+    """LRU cache of decoded frames limited by memory budget.
+
+    Frames are NumPy arrays keyed by frame number. Cached arrays are made
+    read-only as they are shared between everyone who asks for the frame.
+
+    Args:
+        budgetMb (float): Max size of cached frames in megabytes.
+    """
+
+    def __init__(self, budgetMb=512):
+        self.budget = int(budgetMb * 1024 * 1024)
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._frames = collections.OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._frames)
+
+    def __contains__(self, key):
+        return key in self._frames
+
+    def get(self, key):
+        """Cached frame, marking it as recently used.
+
+        Returns:
+            numpy.ndarray: Frame or None if it is not cached.
+        """
+        with self._lock:
+            frame = self._frames.get(key)
+            if frame is None:
+                self.misses += 1
+                return None
+            self._frames.move_to_end(key)
+            self.hits += 1
+            return frame
+
+    def put(self, key, frame):
+        """Add frame, evicting least recently used frames over budget."""
+        if frame.nbytes > self.budget:
+            return
+        frame.setflags(write=False)
+        with self._lock:
+            previous = self._frames.pop(key, None)
+            if previous is not None:
+                self.size -= previous.nbytes
+            self._evict(self.budget - frame.nbytes)
+            self._frames[key] = frame
+            self.size += frame.nbytes
+
+    def setBudget(self, budgetMb):
+        with self._lock:
+            self.budget = int(budgetMb * 1024 * 1024)
+            self._evict(self.budget)
+
+    def clear(self):
+        with self._lock:
+            self._frames.clear()
+            self.size = 0
+
+    def stats(self):
+        with self._lock:
+            requests = self.hits + self.misses
+            return {"frames": len(self._frames),
+                    "sizeMb": self.size / (1024 * 1024),
+                    "budgetMb": self.budget / (1024 * 1024),
+                    "hits": self.hits,
+                    "misses": self.misses,
+                    "evictions": self.evictions,
+                    "hitRate": self.hits / requests if requests else None}
+
+    def _evict(self, maxSize):
+        while self._frames and self.size > maxSize:
+            _, frame = self._frames.popitem(last=False)
+            self.size -= frame.nbytes
+            self.evictions += 1
@@ -0,0 +1,125 @@
+import logging
+from PySide2 import QtCore
+from scripts.playbackStats import PlaybackStats
+
+# Logger
+logger = logging.getLogger(__name__)
+
+
+class FramePlayer(QtCore.QObject):
+    """Plays frames of a frame reader on its own playback clock.
+
+    On every tick the clock tells which frame is due. The frame is taken from
+    the frame cache and frameChanged is emitted exactly once for every
+    presented frame. Frame which was not decoded in time is never decoded on
+    the GUI thread, previous frame stays shown (counted as duplicate) and the
+    reader is asked to decode it in background. When
+    presenting falls behind, frames whose time has already passed are not
+    shown late but skipped and reported through framesDropped, so playback
+    never drifts from the clock. The timer is rescheduled to the due time of
+    the next frame rather than ticking at a fixed interval. Presentation
+    timing of the current (or last) playback session is kept in stats.
+
+    Args:
+        parent (QObject, optional): Parent object.
+    """
+    # Frame, image or None if it is not decoded (previous image stays shown)
+    frameChanged = QtCore.Signal(int, object)
+    # First dropped frame, number of dropped frames
+    framesDropped = QtCore.Signal(int, int)
+    stateChanged = QtCore.Signal(bool)
+    finished = QtCore.Signal()
+
+    def __init__(self, parent=None):
+        super(FramePlayer, self).__init__(parent)
+        self.reader = None
+        self.clock = None
+        self.frame = None
+        self.lastFrame = None
+        self.stats = PlaybackStats()
+        self._timer = QtCore.QTimer(self)
+        self._timer.setTimerType(QtCore.Qt.PreciseTimer)
+        self._timer.setSingleShot(True)
+        self._timer.timeout.connect(self._tick)
+
+    def setReader(self, reader):
+        """Set reader frames are presented from, even while playing."""
+        self.reader = reader
+
+    def isPlaying(self):
+        return self.clock is not None and self.clock.isRunning()
+
+    def play(self, clock, frame, lastFrame):
+        """Start playing.
+
+        Args:
+            clock (PlaybackClock): Clock timing the frames.
+            frame (int): First frame to present.
+            lastFrame (int): Playback stops after presenting this frame.
+        """
+        self.stop()
+        self.clock = clock
+        self.lastFrame = lastFrame
+        self.frame = None
+        self.stats.reset()
+        self.clock.start(frame)
+        self.stateChanged.emit(True)
+        self._tick()
+
+    def seek(self, frame):
+        """Continue playing from frame."""
+        if not self.isPlaying():
+            return
+        self._timer.stop()
+        self.frame = None
+        self.clock.start(frame)
+        self._tick()
+
+    def setLastFrame(self, frame):
+        self.lastFrame = frame
+
+    def stop(self):
+        self._timer.stop()
+        if not self.isPlaying():
+            return
+        self.clock.stop()
+        self.stateChanged.emit(False)
+
+    def _tick(self):
+        due = min(self.clock.frameAt(), self.lastFrame)
+        if due != self.frame:
+            if self.frame is not None and due > self.frame + 1:
+                self._drop(self.frame + 1, due - self.frame - 1)
+            self._present(due)
+        if not self.isPlaying():
+            # Stopped by frameChanged receiver
+            return
+        if due >= self.lastFrame:
+            self.stop()
+            self.finished.emit()
+            return
+
+        delay = self.clock.timeOfFrame(due + 1) - self.clock.now()
+        # Whole milliseconds rounded up, so timer never fires before the frame
+        # is due
+        self._timer.start(max(0, -(-delay // 1000000)))
+
+    def _present(self, frame):
+        image = None
+        if self.reader is not None:
+            image = self.reader.peek(frame)
+            if image is None:
+                # Not prefetched in time, decoding here would stall the GUI
+                # thread and the timer
+                self.reader.prefetch(frame)
+        if image is None:
+            self.stats.recordDuplicated()
+        self.stats.recordPresented(
+            self.clock.timeOfFrame(frame), self.clock.now())
+        self.frame = frame
+        self.frameChanged.emit(frame, image)
+
+    def _drop(self, frame, count):
+        self.stats.recordDropped(count)
+        logger.debug(f"Dropped {count} frames from {frame}")
+        self.framesDropped.emit(frame, count)
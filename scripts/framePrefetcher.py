@@ -0,0 +1,139 @@
+import math
+import time
+import logging
+import threading
+
+# Logger
+logger = logging.getLogger(__name__)
+
+
+class FramePrefetcher(object):
+    """Decodes frames around the playhead into frame cache before they are needed.
+
+    Playhead movement reported through update() is used to infer direction
+    and speed. Frames ahead in the direction of movement (and a few behind)
+    are decoded in a background thread. Number of frames decoded ahead grows
+    with playhead speed and measured decode time, so slow to decode videos
+    are prefetched further ahead.
+
+    Args:
+        reader (VideoFrameReader): Reader used only by prefetcher, shares cache
+            with the player.
+        frameCount (int): Number of frames in the video.
+    """
+    MIN_AHEAD = 4
+    MAX_AHEAD = 120
+    BEHIND = 3
+    # Stay this many frame decodes ahead of the playhead
+    LEAD_DECODES = 8
+    # Fraction of cache budget prefetched frames may take
+    MAX_CACHE_SHARE = 0.5
+
+    def __init__(self, reader, frameCount):
+        self.reader = reader
+        self.frameCount = frameCount
+        self.direction = 1
+        self.speed = 0.0
+        self.prefetched = 0
+        self._playhead = None
+        self._lastUpdate = None
+        self._generation = 0
+        self._running = False
+        self._thread = None
+        self._condition = threading.Condition()
+
+    def start(self):
+        with self._condition:
+            if self._running:
+                return
+            self._running = True
+        self._thread = threading.Thread(
+            target=self._run, name="FramePrefetcher", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout=2.0):
+        with self._condition:
+            self._running = False
+            self._condition.notify()
+        if self._thread:
+            self._thread.join(timeout)
+            self._thread = None
+        self.reader.close()
+
+    def update(self, frame):
+        """Report new playhead position.
+
+        Args:
+            frame (int): Current frame.
+        """
+        now = time.perf_counter()
+        with self._condition:
+            if self._playhead is not None and frame != self._playhead:
+                delta = frame - self._playhead
+                self.direction = 1 if delta > 0 else -1
+                elapsed = max(now - self._lastUpdate, 1e-3)
+                # Smooth speed so single jumps don't blow up prefetch depth
+                self.speed += (abs(delta) / elapsed - self.speed) * 0.3
+            self._playhead = frame
+            self._lastUpdate = now
+            self._generation += 1
+            self._condition.notify()
+
+    def depth(self):
+        """Number of frames to prefetch ahead of the playhead."""
+        decodeTime = self.reader.decodeTime or 0.0
+        # Speed decays when playhead stops moving
+        idle = time.perf_counter() - (self._lastUpdate or 0)
+        speed = self.speed if idle < 0.5 else 0.0
+        ahead = math.ceil(
+            speed * decodeTime * self.LEAD_DECODES) + self.MIN_AHEAD
+        return max(
+            self.MIN_AHEAD, min(ahead, self.MAX_AHEAD, self._cacheLimit()))
+
+    def plan(self, frame):
+        """Frames to prefetch around frame, in order they should be decoded.
+
+        Frames are ordered ascending so decoding needs a single seek in either
+        direction.
+        """
+        ahead = self.depth()
+        if self.direction >= 0:
+            first, last = frame - self.BEHIND, frame + ahead
+        else:
+            first, last = frame - ahead, frame + self.BEHIND
+        return [
+            f for f in range(max(0, first), min(self.frameCount - 1, last) + 1)
+            if f not in self.reader.cache]
+
+    def _cacheLimit(self):
+        cache = self.reader.cache
+        if not len(cache):
+            return self.MAX_AHEAD
+        frameSize = cache.size / len(cache)
+        return max(
+            self.MIN_AHEAD,
+            int(cache.budget * self.MAX_CACHE_SHARE / frameSize))
+
+    def _run(self):
+        generation = None
+        while True:
+            with self._condition:
+                while self._running and (self._playhead is None
+                                         or generation == self._generation):
+                    self._condition.wait()
+                if not self._running:
+                    return
+                generation = self._generation
+                frame = self._playhead
+
+            for target in self.plan(frame):
+                # Playhead moved, plan again around new position
+                if generation != self._generation or not self._running:
+                    break
+                try:
+                    if self.reader.read(target) is not None:
+                        self.prefetched += 1
+                except Exception:
+                    logger.exception(
+                        f"Failed to prefetch frame {target}", exc_info=1)
+                    break
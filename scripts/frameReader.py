@@ -0,0 +1,150 @@
+import time
+import bisect
+import logging
+import threading
+from scripts import lazyImport
+from scripts.frameCache import FrameCache
+
+cv2 = lazyImport.LazyModule("cv2")
+
+# Logger
+logger = logging.getLogger(__name__)
+
+
+class VideoFrameReader(object):
+    """Random access to decoded video frames through a frame cache.
+
+    Consecutive frames are decoded without seeking, cached frames are
+    returned without decoding at all. With keyframe index the reader seeks
+    straight to the keyframe preceding requested frame and decodes forward,
+    or just decodes forward if the frame is later in the current GOP. Frames
+    decoded on the way are cached too. Average time of decoding a single
+    frame (including seeking) is kept in decodeTime.
+
+    Args:
+        filePath (str): Path to video file.
+        cache (FrameCache, optional): Cache to use, new cache with default
+            budget if not set.
+        keyframes (array.array, optional): Sorted frame numbers of keyframes.
+    """
+
+    def __init__(self, filePath, cache=None, keyframes=None):
+        self.filePath = filePath
+        self.cache = cache if cache is not None else FrameCache()
+        self.keyframes = keyframes or None
+        self._capture = None
+        # Frame returned by next capture.read()
+        self._nextFrame = None
+        self._lock = threading.Lock()
+        # Exponential moving average, seconds
+        self.decodeTime = None
+
+    def read(self, frame):
+        """Decoded frame as BGR NumPy array.
+
+        Args:
+            frame (int): Frame number.
+
+        Returns:
+            numpy.ndarray: Frame or None if it could not be decoded.
+        """
+        image = self.cache.get(frame)
+        if image is not None:
+            return image
+
+        with self._lock:
+            start = time.perf_counter()
+            image, decoded = self._decode(frame)
+            if decoded:
+                self._recordDecodeTime((time.perf_counter() - start) / decoded)
+        if image is not None:
+            self.cache.put(frame, image)
+        return image
+
+    def peek(self, frame):
+        """Frame only if it is available without decoding, None otherwise."""
+        return self.cache.get(frame)
+
+    def prefetch(self, frame):
+        """Ask for frame to be decoded without waiting for it.
+
+        Single capture can't decode in background, frames are decoded ahead by
+        FramePrefetcher.
+        """
+
+    def keyframeBefore(self, frame):
+        """Nearest keyframe at or before frame, None without keyframe index."""
+        if self.keyframes is None:
+            return None
+        index = bisect.bisect_right(self.keyframes, frame) - 1
+        return self.keyframes[index] if index >= 0 else 0
+
+    def seekCost(self, frame):
+        """Expected number of frames to decode to get frame.
+
+        Returns:
+            int: 0 if frame is cached, None if unknown because there is no
+                keyframe index.
+        """
+        if frame in self.cache:
+            return 0
+        if frame == self._nextFrame:
+            return 1
+        if self.keyframes is None:
+            return None
+        return frame - self._decodeStart(frame) + 1
+
+    def _recordDecodeTime(self, seconds):
+        if self.decodeTime is None:
+            self.decodeTime = seconds
+        else:
+            self.decodeTime += (seconds - self.decodeTime) * 0.2
+
+    def close(self):
+        with self._lock:
+            if self._capture is not None:
+                self._capture.release()
+                self._capture = None
+            self._nextFrame = None
+
+    def _decodeStart(self, frame):
+        """Frame decoding has to start from to get to frame."""
+        keyframe = self.keyframeBefore(frame)
+        if keyframe is None:
+            # Leave seeking to OpenCV
+            return frame
+        nextFrame = self._nextFrame
+        if nextFrame is not None and keyframe <= nextFrame <= frame:
+            return nextFrame
+        return keyframe
+
+    def _decode(self, frame):
+        """Decode frame.
+
+        Returns:
+            tuple: (image or None, number of decoded frames).
+        """
+        if self._capture is None:
+            self._capture = cv2.VideoCapture(self.filePath)
+            self._nextFrame = 0
+        if frame != self._nextFrame:
+            start = self._decodeStart(frame)
+            if start != self._nextFrame:
+                self._capture.set(cv2.CAP_PROP_POS_FRAMES, start)
+                self._nextFrame = start
+
+        decoded = 0
+        while True:
+            success, image = self._capture.read()
+            decoded += 1
+            if not success:
+                logger.warning(
+                    f"Failed to decode frame {self._nextFrame} of "
+                    f"{self.filePath}")
+                self._nextFrame = None
+                return None, decoded
+            if self._nextFrame == frame:
+                self._nextFrame += 1
+                return image, decoded
+            self.cache.put(self._nextFrame, image)
+            self._nextFrame += 1
@@ -0,0 +1,160 @@
+import os
+import logging
+from scripts import videoFn
+from scripts import lazyImport
+
+numpy = lazyImport.LazyModule("numpy")
+cv2 = lazyImport.LazyModule("cv2")
+
+# Logger
+logger = logging.getLogger(__name__)
+
+
+class RawFrameStore(object):
+    """Every decoded frame of a clip in a memory-mapped file.
+
+    Frames are stored uncompressed in a .npy file, whose header keeps shape
+    and dtype of the frame array. Once built, any frame is served as a
+    read-only view into the mapping without decoding or copying, and the OS
+    page cache decides how much of it stays in memory. Meant for short clips,
+    see estimateSize.
+
+    Has the same reading interface as VideoFrameReader.
+
+    Args:
+        storePath (str): Path to store built by build.
+    """
+    FILE_NAME = "frames.npy"
+
+    def __init__(self, storePath):
+        self.storePath = storePath
+        self.frames = numpy.load(storePath, mmap_mode="r")
+        self.keyframes = None
+        # Nothing is decoded when reading
+        self.decodeTime = 0.0
+
+    def __len__(self):
+        return len(self.frames) if self.frames is not None else 0
+
+    def read(self, frame):
+        """Frame as BGR NumPy array view into the mapping.
+
+        Returns:
+            numpy.ndarray: Frame or None if frame is out of range.
+        """
+        if not 0 <= frame < len(self):
+            return None
+        return self.frames[frame]
+
+    def peek(self, frame):
+        return self.read(frame)
+
+    def prefetch(self, frame):
+        # Every frame is available without decoding
+        pass
+
+    def keyframeBefore(self, frame):
+        # Every frame is directly accessible
+        return frame
+
+    def seekCost(self, frame):
+        return 0
+
+    def close(self):
+        # Mapping is closed once the last view into it is released
+        self.frames = None
+
+    @staticmethod
+    def estimateSize(frameCount, resolution):
+        """Size in bytes of store of frameCount (width, height) frames."""
+        width, height = resolution
+        return frameCount * width * height * 3
+
+    @classmethod
+    def open(cls, storePath, frameCount):
+        """Open existing store.
+
+        Returns:
+            RawFrameStore: Store or None if it does not exist or doesn't match
+                the clip.
+        """
+        if not os.path.isfile(storePath):
+            return None
+        try:
+            store = cls(storePath)
+        except (OSError, ValueError):
+            logger.exception(
+                f"Failed to open frame store {storePath}", exc_info=1)
+            return None
+        if len(store) != frameCount:
+            logger.warning(
+                f"Frame store {storePath} has {len(store)} frames instead of "
+                f"{frameCount}")
+            store.close()
+            return None
+        return store
+
+    @classmethod
+    def build(cls, filePath, storePath, frameCount, resolution, progress=None,
+              cancelEvent=None):
+        """Decode whole clip into a new store.
+
+        Store is written to a temporary file and moved into place only when
+        every frame was decoded, so an existing store is always complete.
+
+        Args:
+            filePath (str): Path to video file.
+            storePath (str): Path of the store to write.
+            frameCount (int): Number of frames in the video.
+            resolution (tuple): Frame (width, height).
+            progress (callable, optional): Called with number of frames decoded
+                so far.
+            cancelEvent (threading.Event, optional): Set to stop and raise
+                videoFn.Cancelled.
+
+        Returns:
+            RawFrameStore: Built store.
+        """
+        width, height = resolution
+        capture = cv2.VideoCapture(filePath)
+        if not capture.isOpened():
+            raise IOError("Failed to open video file {0}".format(filePath))
+
+        tempPath = os.path.splitext(storePath)[0] + ".part.npy"
+        frames = numpy.lib.format.open_memmap(
+            tempPath, mode="w+", dtype=numpy.uint8,
+            shape=(frameCount, height, width, 3))
+        image = None
+        try:
+            try:
+                for frame in range(frameCount):
+                    if cancelEvent is not None and cancelEvent.is_set():
+                        raise videoFn.Cancelled(filePath)
+                    # Decode straight into the mapping
+                    success, image = capture.read(frames[frame])
+                    if not success:
+                        raise IOError(
+                            "Failed to decode frame {0} of {1}".format(
+                                frame, filePath))
+                    if image.shape != frames.shape[1:]:
+                        raise IOError(
+                            "Frame {0} of {1} has unexpected shape {2}".format(
+                                frame, filePath, image.shape))
+                    if not numpy.may_share_memory(image, frames):
+                        frames[frame] = image
+                    if progress:
+                        progress(frame + 1)
+                frames.flush()
+            finally:
+                # Mapping is closed only once no view into it is left, Windows
+                # can't move or remove a mapped file
+                image = None
+                del frames
+        except BaseException:
+            os.remove(tempPath)
+            raise
+        finally:
+            capture.release()
+
+        os.replace(tempPath, storePath)
+        return cls(storePath)
@@ -0,0 +1,54 @@
+import logging
+import threading
+from PySide2 import QtCore
+from scripts import videoFn
+from scripts.frameStore import RawFrameStore
+
+# Logger
+logger = logging.getLogger(__name__)
+
+
+class FrameStoreWorker(QtCore.QThread):
+    """Decodes whole clip into raw frame store in background thread.
+
+    Args:
+        filePath (str): Path to video file.
+        storePath (str): Path of the store to write.
+        frameCount (int): Number of frames in the video.
+        resolution (tuple): Frame (width, height).
+        parent (QObject, optional): Parent object.
+    """
+    progressed = QtCore.Signal(int)
+    built = QtCore.Signal(str, object)
+    failed = QtCore.Signal(str)
+
+    def __init__(self, filePath, storePath, frameCount, resolution,
+                 parent=None):
+        super(FrameStoreWorker, self).__init__(parent)
+        self.filePath = filePath
+        self.storePath = storePath
+        self.frameCount = frameCount
+        self.resolution = resolution
+        self._cancelEvent = threading.Event()
+
+    def cancel(self):
+        self._cancelEvent.set()
+
+    def run(self):
+        try:
+            store = RawFrameStore.build(
+                self.filePath, self.storePath, self.frameCount,
+                self.resolution, progress=self.progressed.emit,
+                cancelEvent=self._cancelEvent)
+        except videoFn.Cancelled:
+            logger.warning(
+                "Frame store build cancelled: {0}".format(self.filePath))
+            return
+        except Exception:
+            logger.exception(
+                "Failed to build frame store of {0}".format(self.filePath),
+                exc_info=1)
+            self.failed.emit(self.filePath)
+            return
+
+        self.built.emit(self.filePath, store)
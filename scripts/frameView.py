@@ -0,0 +1,154 @@
+import threading
+from PySide2 import QtWidgets, QtGui, QtCore
+
+
+def arrayToQImage(array):
+    """Wrap BGR NumPy frame into QImage without copying pixels.
+
+    QImage points straight at array's buffer, so array has to be kept alive
+    and unchanged for as long as the image is used.
+
+    Args:
+        array (numpy.ndarray): Frame of (height, width, 3) uint8 with
+            contiguous rows.
+
+    Returns:
+        QtGui.QImage: Image sharing array's memory.
+    """
+    height, width = array.shape[:2]
+    if array.strides[1] != 3 or array.strides[2] != 1:
+        raise ValueError(
+            "Frame pixels must be contiguous, got strides {0}".format(
+                array.strides))
+    return QtGui.QImage(
+        array.data, width, height, array.strides[0],
+        QtGui.QImage.Format_BGR888)
+
+
+class FrameScaler(QtCore.QThread):
+    """Scales frames to display size in background thread.
+
+    Only the latest request is kept, requests made while a frame is being
+    scaled replace each other.
+    """
+    scaled = QtCore.Signal(int, object)
+
+    def __init__(self, parent=None):
+        super(FrameScaler, self).__init__(parent)
+        self._pending = None
+        self._running = True
+        self._condition = threading.Condition()
+
+    def request(self, key, image, size, array=None):
+        """Scale image to fit size, emits scaled with key when done.
+
+        Args:
+            key (int): Passed back with scaled image.
+            image (QtGui.QImage): Image to scale.
+            size (QtCore.QSize): Size to fit image into, keeping aspect ratio.
+            array (numpy.ndarray, optional): Buffer image is built on, kept
+                alive until scaled.
+        """
+        with self._condition:
+            self._pending = (key, image, QtCore.QSize(size), array)
+            self._condition.notify()
+
+    def stop(self):
+        with self._condition:
+            self._running = False
+            self._pending = None
+            self._condition.notify()
+        self.wait()
+
+    def run(self):
+        while True:
+            with self._condition:
+                while self._running and self._pending is None:
+                    self._condition.wait()
+                if not self._running:
+                    return
+                key, image, size, array = self._pending
+                self._pending = None
+            result = image.scaled(
+                size, QtCore.Qt.KeepAspectRatio,
+                QtCore.Qt.SmoothTransformation)
+            self.scaled.emit(key, result)
+
+
+class FrameView(QtWidgets.QWidget):
+    """Displays decoded NumPy frames.
+
+    Frames are wrapped into QImage without copying and scaled to the widget
+    by FrameScaler, GUI thread only paints the scaled result.
+
+    Args:
+        parent (QWidget, optional): Parent widget.
+    """
+
+    def __init__(self, parent=None):
+        super(FrameView, self).__init__(parent)
+        self.setAttribute(QtCore.Qt.WA_OpaquePaintEvent)
+        self.frame = None
+        self._array = None
+        self._image = None
+        self._scaledImage = None
+        self._key = 0
+        self.scaler = FrameScaler(self)
+        self.scaler.scaled.connect(self._scaled)
+        self.scaler.start()
+
+    def setFrame(self, array, frame=None):
+        """Show BGR frame array.
+
+        Args:
+            array (numpy.ndarray): Frame to show, must not be modified while
+                shown.
+            frame (int, optional): Frame number being shown.
+        """
+        self.frame = frame
+        self._array = array
+        self._image = arrayToQImage(array)
+        self._key += 1
+        self._requestScale()
+
+    def clear(self):
+        self.frame = None
+        self._array = None
+        self._image = None
+        self._scaledImage = None
+        self._key += 1
+        self.update()
+
+    def stop(self):
+        self.scaler.stop()
+
+    def resizeEvent(self, event):
+        super(FrameView, self).resizeEvent(event)
+        self._requestScale()
+
+    def paintEvent(self, event):
+        painter = QtGui.QPainter(self)
+        painter.fillRect(self.rect(), QtCore.Qt.black)
+        if self._scaledImage is None:
+            return
+        x = (self.width() - self._scaledImage.width()) // 2
+        y = (self.height() - self._scaledImage.height()) // 2
+        painter.drawImage(x, y, self._scaledImage)
+
+    def _requestScale(self):
+        if self._image is None or self.width() <= 0 or self.height() <= 0:
+            return
+        fitted = self._image.size().scaled(
+            self.size(), QtCore.Qt.KeepAspectRatio)
+        if self._image.size() == fitted:
+            # Already fits, painted as is
+            self._scaled(self._key, self._image)
+            return
+        self.scaler.request(self._key, self._image, self.size(), self._array)
+
+    def _scaled(self, key, image):
+        # Result of a frame that has been replaced since
+        if key != self._key:
+            return
+        self._scaledImage = image
+        self.update()
@@ -0,0 +1,59 @@
+import logging
+import multiprocessing
+from PySide2 import QtCore
+from scripts import videoFn
+
+# Logger
+logger = logging.getLogger(__name__)
+
+
+class KeyframeIndexWorker(QtCore.QThread):
+    """Builds keyframe index of an opened video in background thread.
+
+    Video is shown as soon as its metadata is read, packets of the whole file
+    are scanned afterwards, so opening a long clip never waits on it.
+
+    Args:
+        filePath (str): Path to video file.
+        workers (int, optional): Max number of scanning processes. Defaults to
+            cpu count.
+        parent (QObject, optional): Parent object.
+    """
+    indexed = QtCore.Signal(str, object)
+    failed = QtCore.Signal(str)
+
+    def __init__(self, filePath, workers=None, parent=None):
+        super(KeyframeIndexWorker, self).__init__(parent)
+        self.filePath = filePath
+        self.workers = workers
+        self._cancelEvent = multiprocessing.Event()
+
+    def cancel(self):
+        self._cancelEvent.set()
+
+    def isCancelled(self):
+        return self._cancelEvent.is_set()
+
+    def run(self):
+        try:
+            keyframes = videoFn.indexKeyframes(
+                self.filePath, workers=self.workers,
+                cancelEvent=self._cancelEvent)
+        except videoFn.Cancelled:
+            logger.warning(
+                "Keyframe indexing cancelled: {0}".format(self.filePath))
+            return
+        except Exception:
+            logger.exception(
+                "Failed to index keyframes of {0}".format(self.filePath),
+                exc_info=1)
+            self.failed.emit(self.filePath)
+            return
+
+        if keyframes is None:
+            logger.warning(
+                f"Keyframes of {self.filePath} can't be indexed, some "
+                "packets have no timestamp")
+            self.failed.emit(self.filePath)
+        elif not self.isCancelled():
+            self.indexed.emit(self.filePath, keyframes)
@@ -0,0 +1,86 @@
+import time
+import logging
+import importlib
+import importlib.util
+import threading
+
+# Logger
+logger = logging.getLogger(__name__)
+
+
+class LazyModule(object):
+    """Stand-in for a module which is imported on first attribute access.
+
+    Heavy modules can be bound at module level and used as usual
+    (cv2.VideoCapture) without paying their import time until the first
+    time they are actually used. Frozen builds have to list such modules
+    as hidden imports. Own attributes are underscored, so they never
+    shadow attributes of the module (numpy.load).
+
+    Args:
+        name (str): Full module name.
+    """
+
+    def __init__(self, name):
+        self._name = name
+        self._module = None
+        self._lock = threading.Lock()
+
+    def _load(self):
+        """Import the module if it was not imported yet."""
+        if self._module is None:
+            # Warm up thread may be importing the same module
+            with self._lock:
+                if self._module is None:
+                    self._module = importlib.import_module(self._name)
+        return self._module
+
+    def _isLoaded(self):
+        return self._module is not None
+
+    def __getattr__(self, attr):
+        # Only called for attributes missing on the stand-in itself
+        return getattr(self._load(), attr)
+
+    def __repr__(self):
+        state = "loaded" if self._module is not None else "not loaded"
+        return f"<LazyModule {self._name} ({state})>"
+
+
+def isAvailable(name):
+    """True if module can be imported, without importing it."""
+    try:
+        return importlib.util.find_spec(name) is not None
+    except (ImportError, ValueError):
+        return False
+
+
+def warmUp(names, callback=None):
+    """Import modules in a background thread so they are ready once needed.
+
+    Args:
+        names (list): Module names, modules that are not installed are skipped.
+        callback (callable, optional): Called from the background thread with
+            dict of module name to import time in seconds.
+
+    Returns:
+        threading.Thread: Started thread.
+    """
+    def run():
+        timings = {}
+        for name in names:
+            if not isAvailable(name):
+                continue
+            start = time.perf_counter()
+            try:
+                importlib.import_module(name)
+            except Exception:
+                logger.exception(f"Failed to import {name}", exc_info=1)
+                continue
+            timings[name] = time.perf_counter() - start
+        if callback:
+            callback(timings)
+
+    thread = threading.Thread(target=run, name="WarmUp", daemon=True)
+    thread.start()
+    return thread
@@ -0,0 +1,431 @@
+import json
+import time
+import asyncio
+import logging
+import collections
+import threading
+import concurrent.futures
+from scripts.syncStats import SyncStats
+
+# Logger
+logger = logging.getLogger(__name__)
+
+
+class MayaClient(object):
+    """Non-blocking client for Maya's command port.
+
+    All network IO runs on an asyncio loop owned by the client in a
+    background thread, so callers never wait on Maya. Every command returns
+    a concurrent.futures.Future resolving to Maya's reply (or None on failure)
+    and accepts an optional callback. Callbacks are passed to
+    callbackInvoker, which lets GUI code have them called on its own thread.
+
+    Commands are pipelined: they are written as soon as they are issued and
+    replies are matched to commands in order, so several commands can be in
+    flight per round trip. Every command is a single line terminated by
+    COMMAND_TERMINATOR, so commands arriving in one chunk are still executed
+    and replied to one by one. If a reply does not arrive in time the
+    connection is reset, as replies can no longer be matched to commands.
+
+    A single long-lived connection is reused for every command and is
+    transparently reopened if Maya dropped it. Round-trip latency and traffic
+    counters are collected in stats.
+
+    Args:
+        port (int): Command port number opened in Maya.
+        host (str): Host Maya is running on.
+        callbackInvoker (callable, optional): Called as
+            callbackInvoker(callback, result). Callbacks are called directly
+            from the network thread if not set.
+    """
+    CONNECT_TIMEOUT = 2.0
+    COMMAND_TIMEOUT = 5.0
+    COMMAND_TERMINATOR = b"\n"
+    REPLY_TERMINATOR = b"\x00"
+    # Replies of commands which raised in Maya
+    ERROR_PREFIXES = ("# Error", "Error:")
+
+    def __init__(self, port=7221, host="localhost", callbackInvoker=None):
+        self.port = port
+        self.host = host
+        self.callbackInvoker = callbackInvoker
+        self.stats = SyncStats()
+        self._reader = None
+        self._writer = None
+        self._loop = None
+        self._thread = None
+        self._replies = collections.deque()
+        self._readerTask = None
+        self._connectLock = None
+        self._threadLock = threading.Lock()
+
+    # ----------------------------------------------------------------------------
+    # PUBLIC
+    # ----------------------------------------------------------------------------
+    def connectAsync(self, port=-1, callback=None):
+        """Open connection to Maya or reuse existing one if it is still alive.
+
+        Args:
+            port (int, optional): Change port before connecting. Defaults to
+                -1.
+            callback (callable, optional): Called with connection success.
+
+        Returns:
+            concurrent.futures.Future: Resolves to connection success.
+        """
+        return self._submit(self._connect(port), callback)
+
+    def connect(self, port=-1):
+        """Blocking version of connectAsync. Do not call from GUI thread.
+
+        Returns:
+            bool: Connection success.
+        """
+        return self.connectAsync(port).result()
+
+    def isConnected(self):
+        """Cheap health check of the current connection, sends nothing to Maya.
+
+        Returns:
+            bool: True if connection is open and peer did not close it.
+        """
+        writer = self._writer
+        reader = self._reader
+        if writer is None or reader is None:
+            return False
+        return not writer.is_closing() and not reader.at_eof()
+
+    def disconnect(self):
+        if self._loop is None:
+            return True
+        self._submit(self._close()).result()
+        return True
+
+    def close(self):
+        """Close connection and stop network thread on shutdown."""
+        with self._threadLock:
+            loop = self._loop
+            thread = self._thread
+            self._loop = None
+            self._thread = None
+        if loop is None:
+            return True
+
+        asyncio.run_coroutine_threadsafe(self._close(), loop).result()
+        loop.call_soon_threadsafe(loop.stop)
+        thread.join()
+        return True
+
+    def sendAsync(self, cmd, callback=None, timeout=None):
+        """Send command without waiting for reply.
+
+        Args:
+            cmd (str): Command to execute in Maya.
+            callback (callable, optional): Called with Maya's reply or None on
+                failure.
+            timeout (float, optional): Seconds to wait for reply. Defaults to
+                COMMAND_TIMEOUT.
+
+        Returns:
+            concurrent.futures.Future: Resolves to Maya's reply, None on
+                failure or if command raised in Maya.
+        """
+        if timeout is None:
+            timeout = self.COMMAND_TIMEOUT
+        return self._submit(self._send(cmd, timeout), callback)
+
+    def send(self, cmd, timeout=None):
+        """Blocking version of sendAsync. Do not call from GUI thread.
+
+        Returns:
+            str: Maya's reply or None on failure.
+        """
+        return self.sendAsync(cmd, timeout=timeout).result()
+
+    def batch(self, commands=None):
+        """Create batch of commands sent to Maya in one round trip.
+
+        Args:
+            commands (list, optional): Command expressions to add.
+
+        Returns:
+            CommandBatch: New batch.
+        """
+        return CommandBatch(self, commands)
+
+    def isErrorReply(self, reply):
+        """True if reply is the error Maya sends back when command raised."""
+        return reply.lstrip().startswith(self.ERROR_PREFIXES)
+
+    @property
+    def inFlight(self):
+        """Number of commands sent to Maya which are not replied to yet."""
+        return len(self._replies)
+
+    # ----------------------------------------------------------------------------
+    # LOOP
+    # ----------------------------------------------------------------------------
+    def _ensureLoop(self):
+        with self._threadLock:
+            if self._loop is None:
+                self._loop = asyncio.new_event_loop()
+                ready = threading.Event()
+                self._thread = threading.Thread(
+                    target=self._runLoop, args=(self._loop, ready),
+                    name="MayaClient", daemon=True)
+                self._thread.start()
+                ready.wait()
+            return self._loop
+
+    def _runLoop(self, loop, ready):
+        asyncio.set_event_loop(loop)
+        self._connectLock = asyncio.Lock()
+        loop.call_soon(ready.set)
+        loop.run_forever()
+        loop.close()
+
+    def _submit(self, coro, callback=None):
+        future = asyncio.run_coroutine_threadsafe(coro, self._ensureLoop())
+        if callback:
+            future.add_done_callback(
+                lambda f: self._invokeCallback(callback, f))
+        return future
+
+    def _invokeCallback(self, callback, future):
+        try:
+            result = future.result()
+        except (concurrent.futures.CancelledError, Exception):
+            logger.exception("Maya command failed", exc_info=1)
+            result = None
+
+        if self.callbackInvoker:
+            self.callbackInvoker(callback, result)
+        else:
+            callback(result)
+
+    # ----------------------------------------------------------------------------
+    # COROUTINES
+    # ----------------------------------------------------------------------------
+    async def _connect(self, port=-1):
+        async with self._connectLock:
+            if port >= 0 and port != self.port:
+                self.port = port
+                await self._close()
+
+            if self.isConnected():
+                return True
+
+            await self._close()
+            try:
+                self._reader, self._writer = await asyncio.wait_for(
+                    asyncio.open_connection(self.host, self.port),
+                    self.CONNECT_TIMEOUT)
+            except (OSError, asyncio.TimeoutError):
+                logger.exception("Failed to create socket", exc_info=1)
+                self._reader = None
+                self._writer = None
+                return False
+
+            self._replies = collections.deque()
+            self._readerTask = asyncio.ensure_future(self._readReplies(
+                self._reader, self._replies))
+            return True
+
+    async def _close(self):
+        writer = self._writer
+        replies = self._replies
+        readerTask = self._readerTask
+        self._reader = None
+        self._writer = None
+        self._replies = collections.deque()
+        self._readerTask = None
+        if readerTask and readerTask is not asyncio.current_task():
+            readerTask.cancel()
+        # Commands waiting for reply will never get one
+        while replies:
+            reply, sentAt = replies.popleft()
+            if not reply.done():
+                reply.set_result(None)
+        if writer is None:
+            return
+        try:
+            writer.close()
+        except Exception:
+            logger.exception("Failed to disconnect socket", exc_info=1)
+
+    async def _send(self, cmd, timeout):
+        if "\n" in cmd:
+            logger.error("Command has to be a single line: {0}".format(cmd))
+            self.stats.recordFailed()
+            return None
+        data = cmd.encode() + self.COMMAND_TERMINATOR
+        # Retry once if connection went stale since last command
+        for attempt in range(2):
+            if not await self._connect():
+                self.stats.recordFailed()
+                return None
+
+            writer = self._writer
+            reply = asyncio.get_event_loop().create_future()
+            # Replies arrive in the order commands were written
+            self._replies.append((reply, time.perf_counter()))
+            writer.write(data)
+            try:
+                await writer.drain()
+                self.stats.recordSent(len(data))
+                break
+            except ConnectionError:
+                logger.warning("Lost connection to Maya, reconnecting...")
+                if writer is self._writer:
+                    await self._close()
+        else:
+            logger.error("Failed to send command: {0}".format(cmd))
+            self.stats.recordFailed()
+            return None
+
+        try:
+            result = await asyncio.wait_for(reply, timeout)
+        except asyncio.TimeoutError:
+            logger.error(
+                "Maya did not reply in {0}s to command: {1}".format(
+                    timeout, cmd))
+            result = None
+            # Later replies would be matched to wrong commands, start over on a
+            # new connection
+            if writer is self._writer:
+                await self._close()
+        if result is not None and self.isErrorReply(result):
+            logger.error(
+                "Maya failed to execute command {0}: {1}".format(
+                    cmd, result.strip()))
+            result = None
+        if result is None:
+            self.stats.recordFailed()
+        return result
+
+    async def _readReplies(self, reader, replies):
+        try:
+            while True:
+                data = await reader.readuntil(self.REPLY_TERMINATOR)
+                if not replies:
+                    logger.warning(
+                        "Unexpected reply from Maya: {0}".format(data))
+                    continue
+                reply, sentAt = replies.popleft()
+                self.stats.recordReply(
+                    len(data), (time.perf_counter() - sentAt) * 1000)
+                if not reply.done():
+                    reply.set_result(data.decode().replace("\x00", ""))
+        except (ConnectionError,
+                asyncio.IncompleteReadError,
+                asyncio.LimitOverrunError):
+            logger.warning("Lost connection to Maya")
+            if reader is self._reader:
+                await self._close()
+
+    # ----------------------------------------------------------------------------
+    # COMMANDS
+    # ----------------------------------------------------------------------------
+
+    # Add command methods here
+    def echo(self, text, callback=None):
+        cmd = "eval(\"'{0}'\")".format(text)
+
+        return self.sendAsync(cmd, callback)
+
+    def setCurrentTime(self, frame, callback=None):
+        cmd = "cmds.currentTime({})".format(frame)
+        return self.sendAsync(cmd, callback)
+
+
+CommandResult = collections.namedtuple(
+    "CommandResult", ["command", "success", "value", "error"])
+
+
+class CommandBatch(object):
+    """Several command expressions executed by Maya as a single payload.
+
+    Each command is evaluated separately on Maya's side, so a failing command
+    does not stop the rest of the batch. Results are returned as a list of
+    CommandResult in the order commands were added.
+
+    Args:
+        client (MayaClient): Client used to send the batch.
+        commands (list, optional): Command expressions to add.
+    """
+    # Evaluated by Maya inside a copy of its __main__ namespace
+    RUNNER = "\n".join([
+        "import json",
+        "_batchResult = []",
+        "for _batchCommand in _batchCommands:",
+        "    try:",
+        "        _batchResult.append([True, eval(_batchCommand), None])",
+        "    except Exception as e:",
+        "        _batchResult.append([False, None, str(e)])",
+        "_batchResult = json.dumps(_batchResult, default=str)"])
+
+    def __init__(self, client, commands=None):
+        self.client = client
+        self.commands = list(commands or [])
+
+    def __len__(self):
+        return len(self.commands)
+
+    def add(self, cmd):
+        self.commands.append(cmd)
+        return self
+
+    def payload(self):
+        """Build single expression running all commands.
+
+        Expression evaluates to results of all commands as JSON.
+        """
+        source = "_batchCommands = {0!r}\n{1}".format(
+            self.commands, self.RUNNER)
+        return ("(lambda ns: (eval(compile({0!r}, '<batch>', 'exec'), ns), "
+                "ns['_batchResult'])[1])(dict(globals()))").format(source)
+
+    def sendAsync(self, callback=None, timeout=None):
+        """Send batch without waiting for reply.
+
+        Args:
+            callback (callable, optional): Called with list of CommandResult or
+                None on failure.
+            timeout (float, optional): Seconds to wait for reply. Defaults to
+                MayaClient.COMMAND_TIMEOUT.
+
+        Returns:
+            concurrent.futures.Future: Resolves to list of CommandResult or
+                None on failure.
+        """
+        if timeout is None:
+            timeout = self.client.COMMAND_TIMEOUT
+        return self.client._submit(self._send(timeout), callback)
+
+    def send(self, timeout=None):
+        """Blocking version of sendAsync. Do not call from GUI thread."""
+        return self.sendAsync(timeout=timeout).result()
+
+    async def _send(self, timeout):
+        if not self.commands:
+            return []
+        reply = await self.client._send(self.payload(), timeout)
+        if reply is None:
+            return None
+        return self.parseReply(reply)
+
+    def parseReply(self, reply):
+        try:
+            results = json.loads(reply.strip())
+        except ValueError:
+            logger.error("Failed to parse batch reply: {0}".format(reply))
+            return None
+        if len(results) != len(self.commands):
+            logger.error(
+                "Batch reply has {0} results for {1} commands".format(
+                    len(results), len(self.commands)))
+            return None
+
+        return [
+            CommandResult(cmd, success, value, error)
+            for cmd, (success, value, error) in zip(self.commands, results)]
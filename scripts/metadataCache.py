@@ -0,0 +1,154 @@
+import os
+import json
+import array
+import shutil
+import hashlib
+import logging
+
+# Logger
+logger = logging.getLogger(__name__)
+
+
+class MetadataCache(object):
+    """Persistent cache of probed video metadata.
+
+    Entries are keyed by file identity (absolute path, size and modification
+    time), so an edited or replaced file is probed again. Bulky per frame data
+    is stored as binary arrays in a cache directory of each file.
+
+    Args:
+        directory (str): Directory to store cache file in.
+    """
+    FILE_NAME = "metadataCache.json"
+    CACHE_DIR = "cache"
+    MAX_ENTRIES = 500
+    # Bump when stored metadata changes, older caches are discarded
+    VERSION = 4
+
+    def __init__(self, directory):
+        self.directory = directory
+        self.filePath = os.path.join(self.directory, self.FILE_NAME)
+        self.entries = {}
+        self.load()
+
+    @staticmethod
+    def fileKey(filePath):
+        """Identity key of the file or None if it can not be accessed."""
+        try:
+            stat = os.stat(filePath)
+        except OSError:
+            return None
+        path = os.path.normcase(os.path.abspath(filePath))
+        return f"{path}|{stat.st_size}|{stat.st_mtime_ns}"
+
+    def get(self, filePath):
+        """Cached metadata of the file.
+
+        Returns:
+            dict: Metadata or None if file is not cached.
+        """
+        key = self.fileKey(filePath)
+        if key is None:
+            return None
+        return self.entries.get(key)
+
+    def cacheDirectory(self, filePath, create=True):
+        """Directory for derived data of the file, unique to file identity.
+
+        Returns:
+            str: Directory path or None if file can not be accessed.
+        """
+        key = self.fileKey(filePath)
+        if key is None:
+            return None
+        directory = self._keyDirectory(key)
+        if create:
+            os.makedirs(directory, exist_ok=True)
+        return directory
+
+    def _keyDirectory(self, key):
+        return os.path.join(
+            self.directory, self.CACHE_DIR,
+            hashlib.sha1(key.encode()).hexdigest())
+
+    def writeArray(self, filePath, name, values):
+        """Store array.array of per frame data of the file."""
+        directory = self.cacheDirectory(filePath)
+        if directory is None:
+            return
+        arrayPath = os.path.join(directory, f"{name}.{values.typecode}")
+        try:
+            with open(arrayPath + ".tmp", "wb") as binaryFile:
+                values.tofile(binaryFile)
+            os.replace(arrayPath + ".tmp", arrayPath)
+        except OSError:
+            logger.exception(
+                f"Failed to save {name} of {filePath}", exc_info=1)
+
+    def readArray(self, filePath, name, typecode):
+        """Load array.array stored with writeArray.
+
+        Returns:
+            array.array: Values or None if not stored.
+        """
+        directory = self.cacheDirectory(filePath, create=False)
+        if directory is None:
+            return None
+        arrayPath = os.path.join(directory, f"{name}.{typecode}")
+        if not os.path.isfile(arrayPath):
+            return None
+        values = array.array(typecode)
+        try:
+            with open(arrayPath, "rb") as binaryFile:
+                values.frombytes(binaryFile.read())
+        except OSError:
+            logger.exception(
+                f"Failed to load {name} of {filePath}", exc_info=1)
+            return None
+        return values
+
+    def put(self, filePath, meta):
+        key = self.fileKey(filePath)
+        if key is None:
+            return
+        # Same path with old size/mtime will never be hit again
+        path = key.rsplit("|", 2)[0]
+        staleKeys = [k for k in self.entries
+                     if k.rsplit("|", 2)[0] == path and k != key]
+        for staleKey in staleKeys:
+            self._remove(staleKey)
+        self.entries[key] = meta
+        # Dicts keep insertion order, drop oldest entries
+        while len(self.entries) > self.MAX_ENTRIES:
+            self._remove(next(iter(self.entries)))
+        self.save()
+
+    def _remove(self, key):
+        del self.entries[key]
+        shutil.rmtree(self._keyDirectory(key), ignore_errors=True)
+
+    def load(self):
+        if not os.path.isfile(self.filePath):
+            return
+        try:
+            with open(self.filePath, "r") as jsonFile:
+                data = json.load(jsonFile)
+        except (OSError, ValueError):
+            logger.exception(
+                "Failed to load metadata cache, starting empty", exc_info=1)
+            return
+        if data.get("version") != self.VERSION:
+            logger.warning("Discarding metadata cache of different version")
+            return
+        self.entries = data["entries"]
+
+    def save(self):
+        tempPath = self.filePath + ".tmp"
+        try:
+            with open(tempPath, "w") as jsonFile:
+                json.dump(
+                    {"version": self.VERSION, "entries": self.entries},
+                    jsonFile, indent=4)
+            os.replace(tempPath, self.filePath)
+        except OSError:
+            logger.exception("Failed to save metadata cache", exc_info=1)
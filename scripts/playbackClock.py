@@ -0,0 +1,95 @@
+import time
+import bisect
+
+
+class PlaybackClock(object):
+    """Maps elapsed wall time to frames at exact frame rate.
+
+    Time is read from a monotonic nanosecond counter and converted to frames
+    with integer math on the rational frame rate, so frame n is due exactly
+    n / rate seconds after the frame clock was started from and no error
+    accumulates over long playback. Variable frame rate videos are timed by
+    their presentation timestamp index instead.
+
+    Args:
+        frameRate (Fraction): Frame rate, may be None if timestamps are set.
+        timestamps (array.array, optional): Presentation time of every frame in
+            microseconds.
+        timer (callable, optional): Current time in nanoseconds. Defaults to
+            time.perf_counter_ns.
+    """
+
+    def __init__(self, frameRate, timestamps=None, timer=time.perf_counter_ns):
+        if not frameRate and not timestamps:
+            raise ValueError("Frame rate or timestamps are required")
+        self.frameRate = frameRate
+        self.timestamps = timestamps or None
+        self.timer = timer
+        self.originFrame = 0
+        self.originTime = None
+
+    def isRunning(self):
+        return self.originTime is not None
+
+    def start(self, frame, now=None):
+        """Start counting from frame, which is due now.
+
+        Args:
+            frame (int): Frame due at start.
+            now (int, optional): Start time in nanoseconds. Defaults to current
+                time.
+        """
+        self.originFrame = frame
+        self.originTime = self.timer() if now is None else now
+
+    def stop(self):
+        self.originTime = None
+
+    def now(self):
+        return self.timer()
+
+    def frameAt(self, now=None):
+        """Frame due at time now (nanoseconds), defaults to current time."""
+        if self.originTime is None:
+            return self.originFrame
+        elapsed = (self.timer() if now is None else now) - self.originTime
+        if self.timestamps:
+            position = self._timestamp(self.originFrame) + elapsed // 1000
+            last = len(self.timestamps) - 1
+            if position >= self.timestamps[last]:
+                # Past the index, last frame lasts one average frame duration
+                overrun = position - self.timestamps[last]
+                frame = last + int(overrun // self._frameDuration())
+            else:
+                frame = bisect.bisect_right(self.timestamps, position) - 1
+            return max(self.originFrame, frame)
+        rate = self.frameRate
+        return self.originFrame + (
+            elapsed * rate.numerator // (rate.denominator * 1000000000))
+
+    def timeOfFrame(self, frame):
+        """Time in nanoseconds frame is due at, None if clock is stopped."""
+        if self.originTime is None:
+            return None
+        if self.timestamps:
+            delta = self._timestamp(frame) - self._timestamp(self.originFrame)
+            return self.originTime + delta * 1000
+        # Rounded up, frame is never presented before it is due
+        rate = self.frameRate
+        ticks = (frame - self.originFrame) * rate.denominator * 1000000000
+        return self.originTime + -(-ticks // rate.numerator)
+
+    def _timestamp(self, frame):
+        last = len(self.timestamps) - 1
+        if frame > last:
+            extra = int((frame - last) * self._frameDuration())
+            return self.timestamps[last] + extra
+        return self.timestamps[max(0, frame)]
+
+    def _frameDuration(self):
+        """Average frame duration in microseconds."""
+        if self.frameRate:
+            return 1000000 / self.frameRate
+        last = len(self.timestamps) - 1
+        span = self.timestamps[last] - self.timestamps[0]
+        return max(1, span) / max(1, last)
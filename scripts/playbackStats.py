@@ -0,0 +1,102 @@
+import math
+import time
+import collections
+from scripts.syncStats import LatencyHistogram
+
+
+class PlaybackStats(object):
+    """Presentation timing of a playback session.
+
+    For every presented frame the time it was due at is compared with the
+    time it was actually presented. Jitter (absolute difference of the two)
+    percentiles are computed over a sliding window of the latest frames, so
+    they follow current conditions, while the whole session is kept in a
+    fixed-size histogram. Dropped frames were skipped because their time
+    passed, duplicated frames could not be read so previous frame stayed
+    on screen.
+
+    Only meant to be used from the thread playback runs on.
+
+    Args:
+        window (int, optional): Number of latest frames jitter percentiles are
+            computed over.
+    """
+    WINDOW = 240
+
+    def __init__(self, window=WINDOW):
+        self.window = window
+        self.reset()
+
+    def reset(self):
+        self.presented = 0
+        self.dropped = 0
+        self.duplicated = 0
+        self.jitter = LatencyHistogram()
+        self.startedAt = time.perf_counter()
+        self.lastPresentedAt = None
+        self._recent = collections.deque(maxlen=self.window)
+
+    def recordPresented(self, intended, actual):
+        """Record presented frame.
+
+        Args:
+            intended (int): Time frame was due at in nanoseconds.
+            actual (int): Time frame was presented at in nanoseconds.
+        """
+        jitter = abs(actual - intended) / 1000000
+        self.presented += 1
+        self.jitter.record(jitter)
+        self._recent.append(jitter)
+        self.lastPresentedAt = time.perf_counter()
+
+    def recordDropped(self, count=1):
+        self.dropped += count
+
+    def recordDuplicated(self, count=1):
+        self.duplicated += count
+
+    def recentPercentile(self, percent):
+        """Exact jitter percentile in ms over sliding window, None if empty."""
+        if not self._recent:
+            return None
+        ordered = sorted(self._recent)
+        return ordered[max(1, math.ceil(percent / 100.0 * len(ordered))) - 1]
+
+    def snapshot(self):
+        """Current values as a plain dict."""
+        elapsed = (self.lastPresentedAt or self.startedAt) - self.startedAt
+        frames = self.presented + self.dropped
+        fps = None
+        if self.presented > 1 and elapsed > 0:
+            fps = (self.presented - 1) / elapsed
+        return {"presented": self.presented,
+                "dropped": self.dropped,
+                "duplicated": self.duplicated,
+                "droppedRate": self.dropped / frames if frames else None,
+                "seconds": elapsed,
+                "fps": fps,
+                "jitterP50": self.recentPercentile(50),
+                "jitterP95": self.recentPercentile(95),
+                "jitterP99": self.recentPercentile(99),
+                "jitterMax": max(self._recent) if self._recent else None,
+                "sessionJitterMean": self.jitter.mean(),
+                "sessionJitterP99": self.jitter.percentile(99),
+                "sessionJitterMax": self.jitter.maximum,
+                "sessionJitterBuckets": self.jitter.buckets()}
+
+    def summary(self):
+        """Short human readable summary for status bar and log."""
+        data = self.snapshot()
+        if data["fps"]:
+            fps = "{0:.2f} fps".format(data["fps"])
+        else:
+            fps = "fps n/a"
+        if data["presented"]:
+            jitter = "jitter p50 {0:.2f} ms, p95 {1:.2f} ms, max {2:.2f} ms"
+            jitter = jitter.format(
+                data["jitterP50"], data["jitterP95"], data["jitterMax"])
+        else:
+            jitter = "jitter n/a"
+        return "{0} | {1} | presented {2}, dropped {3}, duplicated {4}".format(
+            fps, jitter,
+            data["presented"], data["dropped"], data["duplicated"])
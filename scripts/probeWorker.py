@@ -0,0 +1,51 @@
+import logging
+import multiprocessing
+from PySide2 import QtCore
+from scripts import videoFn
+
+# Logger
+logger = logging.getLogger(__name__)
+
+
+class ProbeWorker(QtCore.QThread):
+    """Probes video metadata in background thread.
+
+    Args:
+        filePath (str): Path to video file.
+        parent (QObject, optional): Parent object.
+    """
+    progressed = QtCore.Signal(int)
+    probed = QtCore.Signal(str, object)
+    failed = QtCore.Signal(str)
+    cancelled = QtCore.Signal(str)
+
+    def __init__(self, filePath, parent=None):
+        super(ProbeWorker, self).__init__(parent)
+        self.filePath = filePath
+        self._cancelEvent = multiprocessing.Event()
+
+    def cancel(self):
+        self._cancelEvent.set()
+
+    def isCancelled(self):
+        return self._cancelEvent.is_set()
+
+    def run(self):
+        try:
+            meta = videoFn.probe(
+                self.filePath, progress=self.progressed.emit,
+                cancelEvent=self._cancelEvent)
+        except videoFn.ProbeCancelled:
+            logger.warning("Probing cancelled: {0}".format(self.filePath))
+            self.cancelled.emit(self.filePath)
+            return
+        except Exception:
+            logger.exception(
+                "Failed to read file {0}".format(self.filePath), exc_info=1)
+            self.failed.emit(self.filePath)
+            return
+
+        if self.isCancelled():
+            self.cancelled.emit(self.filePath)
+        else:
+            self.probed.emit(self.filePath, meta)
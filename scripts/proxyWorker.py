@@ -0,0 +1,67 @@
+import os
+import logging
+import threading
+from PySide2 import QtCore
+from scripts import videoFn
+
+# Logger
+logger = logging.getLogger(__name__)
+
+
+class ProxyWorker(QtCore.QThread):
+    """Generates scrubbing proxy of a video in background thread.
+
+    Proxy is discarded if its frame count does not match the source, so frame
+    numbers are guaranteed to be identical.
+
+    Args:
+        filePath (str): Path to source video.
+        proxyPath (str): Path of proxy to write.
+        frameRate (Fraction): Frame rate of the source.
+        frameCount (int): Number of frames in the source.
+        maxWidth (int, optional): Max proxy width.
+        parent (QObject, optional): Parent object.
+    """
+    progressed = QtCore.Signal(int)
+    generated = QtCore.Signal(str, str)
+    failed = QtCore.Signal(str)
+
+    def __init__(self, filePath, proxyPath, frameRate, frameCount,
+                 maxWidth=960, parent=None):
+        super(ProxyWorker, self).__init__(parent)
+        self.filePath = filePath
+        self.proxyPath = proxyPath
+        self.frameRate = frameRate
+        self.frameCount = frameCount
+        self.maxWidth = maxWidth
+        self._cancelEvent = threading.Event()
+
+    def cancel(self):
+        self._cancelEvent.set()
+
+    def run(self):
+        try:
+            frames = videoFn.generateProxy(
+                self.filePath, self.proxyPath, self.frameRate,
+                maxWidth=self.maxWidth, progress=self.progressed.emit,
+                cancelEvent=self._cancelEvent)
+        except videoFn.Cancelled:
+            logger.warning(
+                "Proxy generation cancelled: {0}".format(self.filePath))
+            return
+        except Exception:
+            logger.exception(
+                "Failed to generate proxy of {0}".format(self.filePath),
+                exc_info=1)
+            self.failed.emit(self.filePath)
+            return
+
+        if frames != self.frameCount:
+            logger.error(
+                f"Proxy of {self.filePath} has {frames} frames instead of "
+                f"{self.frameCount}, discarding")
+            os.remove(self.proxyPath)
+            self.failed.emit(self.filePath)
+            return
+
+        self.generated.emit(self.filePath, self.proxyPath)
@@ -0,0 +1,21 @@
+from PySide2 import QtCore
+
+
+class MainThreadInvoker(QtCore.QObject):
+    """Calls callbacks on the thread this object lives in.
+
+    Used to get replies from worker threads delivered to the GUI thread:
+    invoker(callback, result) can be called from any thread and
+    callback(result) is queued to this object's event loop.
+    """
+    _invoke = QtCore.Signal(object, object)
+
+    def __init__(self, parent=None):
+        super(MainThreadInvoker, self).__init__(parent)
+        self._invoke.connect(self._call, QtCore.Qt.QueuedConnection)
+
+    def __call__(self, callback, result):
+        self._invoke.emit(callback, result)
+
+    def _call(self, callback, result):
+        callback(result)
@@ -1,32 +1,52 @@
-import os
-import socket
-import cv2
-import json
-import logging
-from PySide2 import QtWidgets, QtGui, QtCore, QtMultimediaWidgets, QtMultimedia
-from scripts import settingsFn
-from scripts import resources  # noqa: F401
+import time
+# Start of time to interactive window
+START_TIME = time.perf_counter()
+import os  # noqa: E402
+import json  # noqa: E402
+import logging  # noqa: E402
+import multiprocessing  # noqa: E402
+from PySide2 import QtWidgets, QtGui, QtCore  # noqa: E402
+from scripts import lazyImport  # noqa: E402
+from scripts import settingsFn  # noqa: E402
+from scripts import videoFn  # noqa: E402
+from scripts import sequenceFn  # noqa: E402
+from scripts.metadataCache import MetadataCache  # noqa: E402
+from scripts.probeWorker import ProbeWorker  # noqa: E402
+from scripts.keyframeIndexWorker import KeyframeIndexWorker  # noqa: E402
+from scripts.frameCache import FrameCache  # noqa: E402
+from scripts.frameReader import VideoFrameReader  # noqa: E402
+from scripts.framePrefetcher import FramePrefetcher  # noqa: E402
+from scripts.frameStore import RawFrameStore  # noqa: E402
+from scripts.frameStoreWorker import FrameStoreWorker  # noqa: E402
+from scripts.sequenceReader import ImageSequenceReader  # noqa: E402
+from scripts.proxyWorker import ProxyWorker  # noqa: E402
+from scripts.thumbnailWorker import ThumbnailWorker  # noqa: E402
+from scripts.filmstrip import Filmstrip  # noqa: E402
+from scripts.frameView import FrameView  # noqa: E402
+from scripts.framePlayer import FramePlayer  # noqa: E402
+from scripts.qtBridge import MainThreadInvoker  # noqa: E402
+from scripts.referenceSyncEngine import ReferenceSyncEngine  # noqa: E402
+from scripts import resources  # noqa: F401, E402
 
 VERSION = "1.3.2"
+# Media player is created once the window is shown
+QtMultimedia = lazyImport.LazyModule("PySide2.QtMultimedia")
+QtMultimediaWidgets = lazyImport.LazyModule("PySide2.QtMultimediaWidgets")
+# Loaded in background after the window is shown, before a file is opened
+WARM_UP_MODULES = ("numpy", "cv2", "av")
 
 # Logger
 logger = logging.getLogger(__name__)
 
 
-class _videoMetaStruct:
-    def __init__(self):
-        self.readFlag = None
-        self.frameCount = None
-        self.duration = None
-        self.frameRate = None
-
-
 class Window(QtWidgets.QMainWindow):
+    mayaSyncFailed = QtCore.Signal()
 
     def __init__(self, parent=None):
         super(Window, self).__init__(parent)
 
         self.version = VERSION
+        self.startupTime = None
         self.settings = settingsFn.Settings()
 
         # Setup logging file
@@ -37,6 +57,14 @@ class Window(QtWidgets.QMainWindow):
         fileLogHandler.setFormatter(baseFormatter)
         # Add handlers
         logger.addHandler(fileLogHandler)
+        logger.setLevel(logging.INFO)
+
+        # Timing, range and Maya sync, window is a view over it
+        self.mainThreadInvoker = MainThreadInvoker(self)
+        self.engine = ReferenceSyncEngine(
+            port=self.settings.current["port"],
+            callbackInvoker=self.mainThreadInvoker,
+            onSyncError=self.mayaSyncFailed.emit)
 
         # ADD BARS
         self.addStatusBar()
@@ -54,27 +82,84 @@ class Window(QtWidgets.QMainWindow):
         self.createConnections()
         self.toggleOnTop(self.settings.current.get("alwaysOnTop", True), update=False)
 
-        # Video data struct
-        self.videoMeta = _videoMetaStruct()
+        self.metadataCache = MetadataCache(self.settings.directory)
+        self.probeWorker = None
+        self.probeDialog = None
+        # Decoded frames
+        self.frameCache = FrameCache(
+            self.settings.current.get("frameCacheMb", 512))
+        self.frameReader = None
+        self.prefetcher = None
+        self.frameStoreWorker = None
+        # Keyframe index built after opening
+        self.keyframeWorker = None
+        # Scrub proxy
+        self.proxyWorker = None
+        self.proxyPending = False
+        self.mediaSwitch = None
+        self.thumbnailWorker = None
 
         # INIT MAYA CLIENT
-        self.mayaClient = None
-        self.connected = False
         if self.settings.current.get("connectOnStart", False):
             self.connectToMaya()
         self.updateConnectionStatus()
 
+    @property
+    def videoMeta(self):
+        return self.engine.videoMeta
+
+    @property
+    def mediaPlayer(self):
+        if self._mediaPlayer is None:
+            self.initMedia()
+        return self._mediaPlayer
+
+    def initMedia(self):
+        """Create media player and video widget, loads QtMultimedia once."""
+        if self._mediaPlayer is not None:
+            return
+        start = time.perf_counter()
+        self._mediaPlayer = QtMultimedia.QMediaPlayer(
+            None, QtMultimedia.QMediaPlayer.VideoSurface)
+        self.videoWidget = QtMultimediaWidgets.QVideoWidget()
+        self._mediaPlayer.setVideoOutput(self.videoWidget)
+        self._mediaPlayer.setVolume(self.volumeSlider.value())
+        self._mediaPlayer.durationChanged.connect(self.durationChanged)
+        # Under decoded frames and frame counter
+        self.previewLayout.insertWidget(0, self.videoWidget)
+        self.videoWidget.show()
+        self.videoWidget.lower()
+        logger.info(
+            "Media player created in "
+            f"{(time.perf_counter() - start) * 1000:.0f} ms")
+
+    def windowReady(self, startTime=START_TIME):
+        """Report time to interactive window and load what was deferred.
+
+        Called from the event loop once the window is shown.
+        """
+        self.startupTime = time.perf_counter() - startTime
+        logger.info(f"Window interactive in {self.startupTime * 1000:.0f} ms")
+        lazyImport.warmUp(WARM_UP_MODULES, callback=self.modulesWarmedUp)
+        self.initMedia()
+
+    def modulesWarmedUp(self, timings):
+        # Called from warm up thread
+        loaded = ", ".join(
+            f"{name} {seconds * 1000:.0f} ms"
+            for name, seconds in timings.items())
+        logger.info(f"Loaded in background: {loaded}")
+
     def connectToMaya(self):
-        try:
-            del self.mayaClient
-            self.mayaClient = MayaClient(port=self.settings.current["port"])
-            self.connected = self.mayaClient.connect()
-        except Exception as e:
+        self.connectToMayaAction.setEnabled(False)
+        self.engine.connect(
+            self.settings.current["port"], callback=self.mayaConnected)
+
+    def mayaConnected(self, success):
+        self.connectToMayaAction.setEnabled(True)
+        if not success:
             logger.error(
                 f"Failed to connect to port {self.settings.current['port']}")
-            self.connected = self.mayaClient.connect()
-
-        if not self.connected:
             msg = QtWidgets.QMessageBox(parent=self)
             msg.setWindowTitle("Failed to connect")
             msg.setIcon(QtWidgets.QMessageBox.Warning)
@@ -136,6 +221,10 @@ class Window(QtWidgets.QMainWindow):
         self.statusBarAction.setChecked(False)
 
         # Time line panel toggle
+        self.filmstripAction = QtWidgets.QAction("Filmstrip", self)
+        self.filmstripAction.setCheckable(True)
+        self.filmstripAction.setChecked(True)
+
         self.timeLinePanelAction = QtWidgets.QAction("Time Line Panel", self)
         self.timeLinePanelAction.setCheckable(True)
         self.timeLinePanelAction.setChecked(True)
@@ -158,6 +247,22 @@ class Window(QtWidgets.QMainWindow):
         self.setPlayBackStartAction.setShortcut("S")
         self.setPlayBackEndAction.setShortcut("Alt+S")
         # Match playback options
+        self.generateProxyAction = QtWidgets.QAction(
+            "Generate scrub proxy", self)
+        self.generateProxyAction.setCheckable(True)
+        self.generateProxyAction.setChecked(
+            self.settings.current.get("generateProxy", False))
+        self.generateProxyAction.setStatusTip(
+            "Switch to low resolution intra-frame copy of the video once it "
+            "is generated")
+        self.rawFrameStoreAction = QtWidgets.QAction(
+            "Decode short clips to disk", self)
+        self.rawFrameStoreAction.setCheckable(True)
+        self.rawFrameStoreAction.setChecked(
+            self.settings.current.get("rawFrameStore", False))
+        self.rawFrameStoreAction.setStatusTip(
+            "Decode clips under size limit once into memory-mapped file, "
+            "frames are then read without decoding")
         self.matchPlaybackOptionsAction = QtWidgets.QAction(
             "Match player playback options")
 
@@ -178,6 +283,7 @@ class Window(QtWidgets.QMainWindow):
         panelViewSeparator = self.viewMenu.addSeparator()
         panelViewSeparator.setText("Panels")
         self.viewMenu.addAction(self.timeLinePanelAction)
+        self.viewMenu.addAction(self.filmstripAction)
         self.viewMenu.addAction(self.controlPanelAction)
         self.viewMenu.addAction(self.previewPanelAction)
         self.viewMenu.addAction(self.counterAction)
@@ -191,6 +297,8 @@ class Window(QtWidgets.QMainWindow):
         self.playBackMenu.addAction(self.negatePlayBackStartAction)
         self.playBackMenu.addAction(self.setPlayBackStartAction)
         self.playBackMenu.addAction(self.setPlayBackEndAction)
+        self.playBackMenu.addAction(self.generateProxyAction)
+        self.playBackMenu.addAction(self.rawFrameStoreAction)
         mayaPlayBackSeparator = self.playBackMenu.addSeparator()
         mayaPlayBackSeparator.setText("Maya")
         self.playBackMenu.addAction(self.matchPlaybackOptionsAction)
@@ -202,6 +310,16 @@ class Window(QtWidgets.QMainWindow):
         self.statusBar = QtWidgets.QStatusBar()
         self.statusBar.setMaximumHeight(30)
         self.statusBar.setEnabled(False)
+        # Sync stats
+        self.syncStatsLabel = QtWidgets.QLabel()
+        self.statusBar.addPermanentWidget(self.syncStatsLabel)
+        self.syncStatsTimer = QtCore.QTimer(self)
+        self.syncStatsTimer.setInterval(1000)
+        # Playback stats
+        self.playbackStatsLabel = QtWidgets.QLabel()
+        self.statusBar.addPermanentWidget(self.playbackStatsLabel)
+        self.playbackStatsTimer = QtCore.QTimer(self)
+        self.playbackStatsTimer.setInterval(1000)
 
     def createWidgets(self):
         self.mainWidget = QtWidgets.QWidget(self)
@@ -211,9 +329,14 @@ class Window(QtWidgets.QMainWindow):
         boldFont = QtGui.QFont()
         boldFont.setBold(True)
         # VIDEO
-        self.mediaPlayer = QtMultimedia.QMediaPlayer(
-            None, QtMultimedia.QMediaPlayer.VideoSurface)
-        self.videoWidget = QtMultimediaWidgets.QVideoWidget()
+        # Created by initMedia
+        self._mediaPlayer = None
+        self.videoWidget = None
+        # Presents frames during playback, media player only provides audio
+        self.framePlayer = FramePlayer(self)
+        # Shows decoded frames on top of video widget while paused
+        self.frameView = FrameView()
+        self.frameView.hide()
         self.frameCounter = QtWidgets.QLineEdit()
         self.frameCounter.setMaximumSize(40, 20)
         self.frameCounter.setFrame(False)
@@ -221,13 +344,12 @@ class Window(QtWidgets.QMainWindow):
         self.frameCounter.setStyleSheet("background-color: rgba(0, 0, 0, 0);")
         self.frameCounter.setValidator(QtGui.QIntValidator(-9999, 9999))
         self.frameCounter.setEnabled(False)
-        self.mediaPlayer.setVideoOutput(self.videoWidget)
-        self.videoWidget.show()
 
         # TIMELINE
         self.playBackOffset = QtWidgets.QLineEdit()
         self.playBackStart = QtWidgets.QLineEdit()
         self.timeSlider = QtWidgets.QSlider(QtCore.Qt.Horizontal)
+        self.filmstrip = Filmstrip(videoFn.THUMBNAIL_HEIGHT)
         self.playBackEnd = QtWidgets.QLineEdit()
         self.videoEnd = QtWidgets.QLineEdit()
         self.playBackOffset.setValidator(QtGui.QIntValidator(-9999, 9999))
@@ -284,17 +406,22 @@ class Window(QtWidgets.QMainWindow):
     def createLayouts(self):
         self.previewPanel = QtWidgets.QWidget()
         stackedLayout = QtWidgets.QStackedLayout()
-        stackedLayout.addWidget(self.videoWidget)
+        stackedLayout.addWidget(self.frameView)
         stackedLayout.addWidget(self.frameCounter)
         stackedLayout.setStackingMode(QtWidgets.QStackedLayout.StackAll)
         self.previewPanel.setLayout(stackedLayout)
+        self.previewLayout = stackedLayout
 
         self.timeLinePanel = QtWidgets.QWidget()
         timeLineLayout = QtWidgets.QHBoxLayout()
         timeLineLayout.setContentsMargins(0, 0, 0, 0)
         timeLineLayout.addWidget(self.playBackOffset)
         timeLineLayout.addWidget(self.playBackStart)
-        timeLineLayout.addWidget(self.timeSlider)
+        sliderLayout = QtWidgets.QVBoxLayout()
+        sliderLayout.setSpacing(0)
+        sliderLayout.addWidget(self.filmstrip)
+        sliderLayout.addWidget(self.timeSlider)
+        timeLineLayout.addLayout(sliderLayout)
         timeLineLayout.addWidget(self.playBackEnd)
         timeLineLayout.addWidget(self.videoEnd)
         self.timeLinePanel.setLayout(timeLineLayout)
@@ -341,11 +468,14 @@ class Window(QtWidgets.QMainWindow):
         self.setPlayBackStartAction.triggered.connect(
             self.setCurrentFrameAsStart)
         self.setPlayBackEndAction.triggered.connect(self.setCurrentFrameAsEnd)
+        self.generateProxyAction.toggled.connect(self.toggleGenerateProxy)
+        self.rawFrameStoreAction.toggled.connect(self.toggleRawFrameStore)
         self.matchPlaybackOptionsAction.triggered.connect(
             self.setMayaPlaybackOptions)
         # View
         self.counterAction.toggled.connect(self.frameCounter.setVisible)
         self.timeLinePanelAction.toggled.connect(self.timeLinePanel.setVisible)
+        self.filmstripAction.toggled.connect(self.filmstrip.setVisible)
         self.controlPanelAction.toggled.connect(self.controlPanel.setVisible)
         self.previewPanelAction.toggled.connect(self.previewPanel.setVisible)
         self.alwaysOnTopAction.toggled.connect(self.toggleOnTop)
@@ -355,15 +485,20 @@ class Window(QtWidgets.QMainWindow):
         self.statusBarAction.toggled.connect(self.statusBar.setVisible)
         # FRAME COUNTER
         self.frameCounter.returnPressed.connect(self.goToFrame)
+        self.filmstrip.frameClicked.connect(self.toFrame)
 
         # MAYA COMMANDS
         self.timeSlider.valueChanged.connect(self.setMayaTimeSlider)
+        self.timeSlider.valueChanged.connect(self.prefetchFrames)
+        self.syncCheckBox.toggled.connect(self.engine.setSyncEnabled)
+        self.playBackOffset.textChanged.connect(self.setOffset)
+        self.mayaSyncFailed.connect(self.mayaConnectionLost)
 
         # PLAYBACK
         self.playButton.clicked.connect(self.play)
-        self.mediaPlayer.positionChanged.connect(self.positionChanged)
-        self.mediaPlayer.durationChanged.connect(self.durationChanged)
-        self.mediaPlayer.stateChanged.connect(self.mediaStateChanged)
+        self.framePlayer.frameChanged.connect(self.playbackFrameChanged)
+        self.framePlayer.stateChanged.connect(self.playbackStateChanged)
+        self.framePlayer.finished.connect(self.playbackFinished)
         self.timeSlider.sliderMoved.connect(self.setPosition)
         self.frameForwardButton.clicked.connect(self.stepFrameForward)
         self.frameBackButton.clicked.connect(self.stepFrameBackward)
@@ -380,125 +515,613 @@ class Window(QtWidgets.QMainWindow):
 
         # Status bar
         self.statusBar.messageChanged.connect(self.hideEmptyStatusBar)
+        self.syncStatsTimer.timeout.connect(self.updateSyncStats)
+        self.playbackStatsTimer.timeout.connect(self.updatePlaybackStats)
 
     def setMayaTimeSlider(self, *args):
-        if self.syncCheckBox.isChecked() and self.connected:
-            if self.mayaClient.connect():
-                self.mayaClient.setCurrentTime(
-                    int(self.playBackOffset.text()) + self.timeSlider.value())
-            else:
-                self.timeSlider.valueChanged.disconnect()
+        self.engine.setFrame(self.timeSlider.value())
+
+    def setOffset(self, text):
+        try:
+            self.engine.setOffset(int(text))
+        except ValueError:
+            # Unfinished input like "-"
+            pass
+
+    def prefetchFrames(self, frame):
+        if self.prefetcher:
+            self.prefetcher.update(frame)
+
+    def mayaConnectionLost(self):
+        logger.error("Lost connection to Maya")
+        self.engine.connectionLost()
+        self.updateConnectionStatus()
 
     def openFile(self):
         fileName, _ = QtWidgets.QFileDialog.getOpenFileName(
             self, "Open Reference", QtCore.QDir.homePath())
         if fileName:
-            # STORE META DATA
-            self.videoMeta.path = fileName
-            self.videoMeta.frameCount = self.getFrames(fileName)
+            # Abort probing and proxy of previously opened file
+            self.cancelProbe()
+            self.cancelKeyframeIndex()
+            self.cancelProxy()
+            self.cancelThumbnails()
+            self.cancelFrameStore()
+            if sequenceFn.isSequenceFile(fileName):
+                self.loadSequence(fileName)
+                return
+            meta = self.metadataCache.get(fileName)
+            if meta is None:
+                self.startProbe(fileName)
+            else:
+                indices = {}
+                for name in ("timestamps", "keyframes"):
+                    if meta.get(name + "Index"):
+                        indices[name] = self.metadataCache.readArray(
+                            fileName, name, "q")
+                self.loadVideo(fileName, meta, **indices)
+
+    def startProbe(self, fileName):
+        self.probeWorker = ProbeWorker(fileName, parent=self)
+        self.probeWorker.progressed.connect(self.updateProbeProgress)
+        self.probeWorker.probed.connect(self.videoProbed)
+        self.probeWorker.failed.connect(self.probeFailed)
+        self.probeWorker.cancelled.connect(self.probeFailed)
+        self.probeWorker.finished.connect(self.probeWorker.deleteLater)
+
+        # Single dialog is reused by every probe
+        if self.probeDialog is None:
+            self.probeDialog = QtWidgets.QProgressDialog(
+                "Processing video...", "Cancel", 0, 0, self)
+            self.probeDialog.setWindowTitle("Open Reference")
+            self.probeDialog.setWindowModality(QtCore.Qt.NonModal)
+            self.probeDialog.setAutoClose(False)
+            self.probeDialog.setAutoReset(False)
+            self.probeDialog.canceled.connect(self.cancelProbe)
+        self.probeDialog.setLabelText("Processing video...")
+        self.probeWorker.start()
+        # Don't flash the dialog for videos with frame count in meta data
+        QtCore.QTimer.singleShot(500, self.showProbeDialog)
+
+    def showProbeDialog(self):
+        if self.probeWorker and self.probeWorker.isRunning():
+            self.probeDialog.show()
+
+    def updateProbeProgress(self, frames):
+        if self.sender() is self.probeWorker:
+            self.probeDialog.setLabelText(f"Counting frames: {frames}")
+
+    def cancelProbe(self):
+        if self.probeWorker is None:
+            return
+        self.probeWorker.cancel()
+        self.probeWorker = None
+        self.probeDialog.close()
+        self.statusBar.showMessage("Opening cancelled", 4000)
+
+    def probeFailed(self, fileName):
+        if self.sender() is not self.probeWorker:
+            return
+        self.probeWorker = None
+        self.probeDialog.close()
+        self.statusBar.showMessage(f"Failed to read file {fileName}", 5000)
+
+    def videoProbed(self, fileName, meta):
+        if self.sender() is not self.probeWorker:
+            return
+        self.probeWorker = None
+        self.probeDialog.close()
+        # Indices are stored as binary arrays next to the metadata
+        indices = {}
+        for name in ("timestamps", "keyframes"):
+            indices[name] = meta.pop(name)
+            meta[name + "Index"] = indices[name] is not None
+            if indices[name] is not None:
+                self.metadataCache.writeArray(fileName, name, indices[name])
+        self.metadataCache.put(fileName, meta)
+        self.loadVideo(fileName, meta, **indices)
+
+    def loadVideo(self, fileName, meta, timestamps=None, keyframes=None):
+        # STORE META DATA
+        self.engine.loadVideo(fileName, meta, timestamps)
+
+        # Decoded frames of previous video are of no use
+        self.framePlayer.stop()
+        if self.prefetcher:
+            self.prefetcher.stop()
+        if self.frameReader:
+            self.frameReader.close()
+        self.frameCache.clear()
+        self.frameReader = VideoFrameReader(
+            fileName, self.frameCache, keyframes)
+        self.prefetcher = FramePrefetcher(
+            VideoFrameReader(fileName, self.frameCache, keyframes),
+            self.videoMeta.frameCount)
+        self.prefetcher.start()
+        self.framePlayer.setReader(self.frameReader)
+
+        # SET MEDIA FILE
+        self.mediaSwitch = None
+        self.hideFrameView()
+        self.mediaPlayer.setMedia(QtMultimedia.QMediaContent(
+            QtCore.QUrl.fromLocalFile(fileName)))
+        self.mediaPlayer.play()
+        self.mediaPlayer.pause()
+        for btn in [self.playButton, self.backToStartButton, self.frameBackButton, self.frameForwardButton, self.toEndButton]:
+            btn.setEnabled(True)
+
+        if keyframes is None and videoFn.av is not None:
+            self.startKeyframeIndex()
+        self.startThumbnails()
+        # Started once source duration is handled, switching to proxy before
+        # that would skip it
+        self.proxyPending = self.settings.current.get("generateProxy", False)
+        if self.settings.current.get("rawFrameStore", False):
+            self.startFrameStore()
+
+    def startKeyframeIndex(self):
+        self.keyframeWorker = KeyframeIndexWorker(
+            self.videoMeta.path, parent=self)
+        self.keyframeWorker.indexed.connect(self.keyframesIndexed)
+        self.keyframeWorker.failed.connect(self.keyframeIndexFailed)
+        self.keyframeWorker.finished.connect(self.keyframeWorker.deleteLater)
+        self.keyframeWorker.start(QtCore.QThread.LowPriority)
+
+    def cancelKeyframeIndex(self):
+        if self.keyframeWorker is None:
+            return
+        self.keyframeWorker.cancel()
+        self.keyframeWorker = None
+
+    def keyframeIndexFailed(self, fileName):
+        if self.sender() is self.keyframeWorker:
+            self.keyframeWorker = None
+
+    def keyframesIndexed(self, fileName, keyframes):
+        if self.sender() is not self.keyframeWorker:
+            return
+        self.keyframeWorker = None
+        meta = self.metadataCache.get(fileName)
+        if meta is not None:
+            self.metadataCache.writeArray(fileName, "keyframes", keyframes)
+            meta["keyframesIndex"] = True
+            self.metadataCache.put(fileName, meta)
+        if fileName != self.videoMeta.path:
+            return
+        # Readers seek straight to keyframes from now on
+        for reader in (self.frameReader,
+                       self.prefetcher.reader if self.prefetcher else None):
+            if isinstance(reader, VideoFrameReader):
+                reader.keyframes = keyframes
+
+    def loadSequence(self, fileName):
+        numbers, paths = sequenceFn.detectSequence(fileName)
+        # Frames keep their numbers, Maya frame of the first one is its number
+        paths = sequenceFn.fillGaps(numbers, paths)
+        # STORE META DATA
+        self.engine.loadSequence(
+            fileName, len(paths),
+            self.settings.current.get("sequenceFrameRate", 24), numbers[0])
+
+        self.framePlayer.stop()
+        if self.prefetcher:
+            self.prefetcher.stop()
+            self.prefetcher = None
+        if self.frameReader:
+            self.frameReader.close()
+        self.frameCache.clear()
+        # Reader decodes ahead on its own, no prefetcher needed
+        self.frameReader = ImageSequenceReader(
+            paths, self.frameCache,
+            onDecoded=lambda frame: self.mainThreadInvoker(
+                self.sequenceFrameDecoded, frame))
+        self.framePlayer.setReader(self.frameReader)
+        image = self.frameReader.read(0)
+        if image is None:
+            self.statusBar.showMessage(f"Failed to read file {fileName}", 5000)
+            return
+        self.videoMeta.resolution = (image.shape[1], image.shape[0])
+
+        # Frames are shown by frame view only
+        self.mediaSwitch = None
+        self.proxyPending = False
+        self.mediaPlayer.setMedia(QtMultimedia.QMediaContent())
+        self.filmstrip.clear()
+        self.resetTimeline()
+        for btn in [self.playButton, self.backToStartButton, self.frameBackButton, self.frameForwardButton, self.toEndButton]:
+            btn.setEnabled(True)
+        self.showDecodedFrame(0, decode=True)
+        message = (f"Opened sequence of {len(paths)} frames "
+                   f"({numbers[0]}-{numbers[-1]})")
+        missing = len(paths) - len(numbers)
+        if missing:
+            message += f", {missing} missing frames hold previous one"
+        self.statusBar.showMessage(message, 5000)
+
+    def startFrameStore(self):
+        if (not self.videoMeta.path or self.videoMeta.isSequence
+                or self.frameStoreWorker
+                or isinstance(self.frameReader, RawFrameStore)):
+            return
+        size = RawFrameStore.estimateSize(
+            self.videoMeta.frameCount, self.videoMeta.resolution)
+        maxSize = self.settings.current.get("rawFrameStoreMaxMb", 2048)
+        if size > maxSize * 1024 * 1024:
+            logger.info(
+                f"{self.videoMeta.path} is too long for raw frame store "
+                f"({size // (1024 * 1024)} MB)")
+            return
+
+        storePath = os.path.join(
+            self.metadataCache.cacheDirectory(self.videoMeta.path),
+            RawFrameStore.FILE_NAME)
+        store = RawFrameStore.open(storePath, self.videoMeta.frameCount)
+        if store is not None:
+            self.useFrameStore(self.videoMeta.path, store)
+            return
+
+        self.frameStoreWorker = FrameStoreWorker(
+            self.videoMeta.path, storePath, self.videoMeta.frameCount,
+            self.videoMeta.resolution, parent=self)
+        self.frameStoreWorker.progressed.connect(self.updateFrameStoreProgress)
+        self.frameStoreWorker.built.connect(self.frameStoreBuilt)
+        self.frameStoreWorker.failed.connect(self.frameStoreFailed)
+        self.frameStoreWorker.finished.connect(
+            self.frameStoreWorker.deleteLater)
+        self.frameStoreWorker.start()
+
+    def cancelFrameStore(self):
+        if self.frameStoreWorker is None:
+            return
+        self.frameStoreWorker.cancel()
+        self.frameStoreWorker = None
+        self.statusBar.clearMessage()
+
+    def updateFrameStoreProgress(self, frames):
+        if self.sender() is self.frameStoreWorker:
+            self.statusBar.showMessage(
+                f"Decoding to disk: {frames}/{self.videoMeta.frameCount}")
+
+    def frameStoreFailed(self, fileName):
+        if self.sender() is not self.frameStoreWorker:
+            return
+        self.frameStoreWorker = None
+        self.statusBar.showMessage(
+            f"Failed to decode {fileName} to disk", 5000)
+
+    def frameStoreBuilt(self, fileName, store):
+        if self.sender() is not self.frameStoreWorker:
+            store.close()
+            return
+        self.frameStoreWorker = None
+        self.useFrameStore(fileName, store)
+
+    def useFrameStore(self, fileName, store):
+        if fileName != self.videoMeta.path:
+            store.close()
+            return
+        # Every frame is a view into the store now, nothing left to decode or
+        # cache
+        if self.prefetcher:
+            self.prefetcher.stop()
+            self.prefetcher = None
+        if self.frameReader:
+            self.frameReader.close()
+        self.frameReader = store
+        self.framePlayer.setReader(store)
+        self.frameCache.clear()
+        self.statusBar.showMessage("Reading frames from raw frame store", 4000)
+
+    def toggleRawFrameStore(self, state):
+        self.settings.current["rawFrameStore"] = state
+        self.settings.save()
+        if state:
+            self.startFrameStore()
+        else:
+            self.cancelFrameStore()
+
+    def startThumbnails(self):
+        self.filmstrip.clear()
+        if not self.videoMeta.frameCount:
+            return
+        cacheDirectory = os.path.join(
+            self.metadataCache.cacheDirectory(self.videoMeta.path),
+            "thumbnails")
+        os.makedirs(cacheDirectory, exist_ok=True)
+        self.thumbnailWorker = ThumbnailWorker(
+            self.videoMeta.path, self.videoMeta.frameCount, cacheDirectory,
+            parent=self)
+        self.thumbnailWorker.thumbnailReady.connect(self.addThumbnail)
+        self.thumbnailWorker.failed.connect(self.thumbnailsFailed)
+        self.thumbnailWorker.finished.connect(self.thumbnailsFinished)
+        self.thumbnailWorker.finished.connect(self.thumbnailWorker.deleteLater)
+        self.thumbnailWorker.start()
+
+    def cancelThumbnails(self):
+        if self.thumbnailWorker is None:
+            return
+        self.thumbnailWorker.cancel()
+        self.thumbnailWorker = None
+
+    def addThumbnail(self, frame, image):
+        if self.sender() is self.thumbnailWorker:
+            self.filmstrip.addThumbnail(frame, image)
+
+    def thumbnailsFailed(self, fileName):
+        if self.sender() is self.thumbnailWorker:
+            self.statusBar.showMessage(
+                f"Failed to generate thumbnails of {fileName}", 5000)
+
+    def thumbnailsFinished(self):
+        # Worker is deleted once finished
+        if self.sender() is self.thumbnailWorker:
+            self.thumbnailWorker = None
+
+    def startProxy(self):
+        if (not self.videoMeta.path or self.videoMeta.isSequence
+                or self.proxyWorker):
+            return
+        # Proxy is written at constant rate, VFR timing could not be kept
+        if self.videoMeta.variableFrameRate or not self.videoMeta.frameRate:
+            logger.warning(
+                f"Scrub proxy is not supported for {self.videoMeta.path}")
+            return
+
+        proxyPath = os.path.join(
+            self.metadataCache.cacheDirectory(self.videoMeta.path),
+            "proxy.avi")
+        if os.path.isfile(proxyPath):
+            if self.proxyKeepsAudio(proxyPath):
+                self.switchToProxy(self.videoMeta.path, proxyPath)
+                return
+            if videoFn.av is None:
+                logger.info(
+                    f"Scrub proxy of {self.videoMeta.path} has no audio, "
+                    "keeping source")
+                return
+            # Proxy was written without audio, write it again with audio
+
+        self.proxyWorker = ProxyWorker(
+            self.videoMeta.path, proxyPath, self.videoMeta.frameRate,
+            self.videoMeta.frameCount,
+            maxWidth=self.settings.current.get("proxyMaxWidth", 960),
+            parent=self)
+        self.proxyWorker.progressed.connect(self.updateProxyProgress)
+        self.proxyWorker.generated.connect(self.proxyGenerated)
+        self.proxyWorker.failed.connect(self.proxyFailed)
+        self.proxyWorker.finished.connect(self.proxyWorker.deleteLater)
+        self.proxyWorker.start()
+
+    def cancelProxy(self):
+        self.proxyPending = False
+        if self.proxyWorker is None:
+            return
+        self.proxyWorker.cancel()
+        self.proxyWorker = None
+        self.statusBar.clearMessage()
+
+    def updateProxyProgress(self, frames):
+        if self.sender() is self.proxyWorker:
+            self.statusBar.showMessage(
+                "Generating scrub proxy: "
+                f"{frames}/{self.videoMeta.frameCount}")
+
+    def proxyFailed(self, fileName):
+        if self.sender() is not self.proxyWorker:
+            return
+        self.proxyWorker = None
+        self.statusBar.showMessage(
+            f"Failed to generate scrub proxy for {fileName}", 5000)
+
+    def proxyGenerated(self, fileName, proxyPath):
+        if self.sender() is not self.proxyWorker:
+            return
+        self.proxyWorker = None
+        self.switchToProxy(fileName, proxyPath)
+
+    def proxyKeepsAudio(self, proxyPath):
+        """False if source has audio which proxy is missing.
+
+        Media player plays audio too, so proxy without it can't replace source.
+        """
+        sourceAudio = videoFn.hasAudio(self.videoMeta.path)
+        if sourceAudio is None:
+            sourceAudio = self.mediaPlayer.isAudioAvailable()
+        return not sourceAudio or bool(videoFn.hasAudio(proxyPath))
+
+    def switchToProxy(self, fileName, proxyPath):
+        if fileName != self.videoMeta.path:
+            return
+        if not self.proxyKeepsAudio(proxyPath):
+            logger.info(
+                f"Scrub proxy of {fileName} has no audio, keeping source")
+            return
+        # Proxy has same frames and rate, so only playback position needs to be
+        # carried over
+        wasPlaying = self.framePlayer.isPlaying()
+        self.mediaSwitch = (self.mediaPlayer.position(), wasPlaying)
+        self.mediaPlayer.setMedia(QtMultimedia.QMediaContent(
+            QtCore.QUrl.fromLocalFile(proxyPath)))
+        self.mediaPlayer.play()
+        if not wasPlaying:
+            self.mediaPlayer.pause()
+        self.statusBar.showMessage("Switched to scrub proxy", 4000)
 
-            # SET MEDIA FILE
-            self.mediaPlayer.setMedia(QtMultimedia.QMediaContent(
-                QtCore.QUrl.fromLocalFile(fileName)))
+    def toggleGenerateProxy(self, state):
+        self.settings.current["generateProxy"] = state
+        self.settings.save()
+        if state:
+            self.startProxy()
+        else:
+            self.cancelProxy()
+
+    def play(self, *args):
+        if self.framePlayer.isPlaying():
+            self.pause()
+            return
+        clock = self.engine.createClock()
+        if clock is None:
+            return
+        if self.timeSlider.value() >= self.timeSlider.maximum():
+            self.toStart()
+        frame = self.timeSlider.value()
+        if not self.videoMeta.isSequence:
+            self.mediaPlayer.setPosition(self.frameToPosition(frame))
             self.mediaPlayer.play()
+        self.framePlayer.play(clock, frame, self.timeSlider.maximum())
+
+    def pause(self):
+        self.framePlayer.stop()
+        if not self.videoMeta.isSequence:
             self.mediaPlayer.pause()
-            for btn in [self.playButton, self.backToStartButton, self.frameBackButton, self.frameForwardButton, self.toEndButton]:
-                btn.setEnabled(True)
+            self.mediaPlayer.setPosition(
+                self.frameToPosition(self.timeSlider.value()))
 
-    def play(self, *args):
-        if self.mediaPlayer.state() == QtMultimedia.QMediaPlayer.PlayingState:
+    def playbackFrameChanged(self, frame, image):
+        self.timeSlider.setValue(frame)
+        self.frameCounter.setText(str(frame))
+        # Frame that failed to decode keeps previous one on screen
+        if image is not None:
+            self.showFrame(image, frame)
+
+    def playbackFinished(self):
+        if not self.videoMeta.isSequence:
             self.mediaPlayer.pause()
-        else:
-            if self.timeSlider.value() >= self.timeSlider.maximum():
-                self.toStart()
-            self.mediaPlayer.play()
 
-    def mediaStateChanged(self, state):
-        if self.mediaPlayer.state() == QtMultimedia.QMediaPlayer.PlayingState:
+    def playbackStateChanged(self, playing):
+        if playing:
             self.playButton.setIcon(
                 self.style().standardIcon(QtWidgets.QStyle.SP_MediaPause))
             self.frameCounter.setEnabled(False)
+            self.playbackStatsTimer.start()
         else:
             self.playButton.setIcon(
                 self.style().standardIcon(QtWidgets.QStyle.SP_MediaPlay))
             self.frameCounter.setEnabled(True)
-
-    def positionChanged(self, position):
-        if self.mediaPlayer.state() == QtMultimedia.QMediaPlayer.PlayingState:
-            frame = self.positionToFrame(position)
-            if frame:
-                if frame >= self.timeSlider.maximum():
-                    self.timeSlider.setValue(self.timeSlider.maximum())
-                    self.mediaPlayer.pause()
-                else:
-                    self.timeSlider.setValue(frame)
-
-                self.frameCounter.setText(str(self.timeSlider.value()))
+            self.playbackStatsTimer.stop()
+            self.updatePlaybackStats()
+            logger.info(
+                f"Playback stats ({self.videoMeta.frameRateText()}): "
+                f"{self.framePlayer.stats.summary()}")
 
     def setPosition(self, position):
         self.frameCounter.setText(str(position))
+        if self.framePlayer.isPlaying():
+            self.framePlayer.seek(position)
+            if not self.videoMeta.isSequence:
+                self.mediaPlayer.setPosition(self.frameToPosition(position))
+            return
+        if self.videoMeta.isSequence:
+            self.showSequenceFrame(position)
+            return
+        image = self.frameReader.peek(position) if self.frameReader else None
+        if image is not None:
+            # Cached frame costs no decode, media position is synced when
+            # playback starts
+            self.showFrame(image, position)
+            return
         currentPosition = self.frameToPosition(position)
         self.mediaPlayer.setPosition(currentPosition)
         self.mediaPlayer.play()
         self.mediaPlayer.pause()
+        self.showDecodedFrame(position)
+
+    def showSequenceFrame(self, frame):
+        """Show sequence frame if decoded, nearest decoded one until it is."""
+        image = self.frameReader.peek(frame)
+        if image is None:
+            # Decoding on GUI thread would block scrubbing, frame is shown by
+            # sequenceFrameDecoded
+            self.frameReader.prefetch(frame)
+            nearest, image = self.frameReader.peekNearest(frame)
+            if image is None:
+                return
+            frame = nearest
+        self.showFrame(image, frame)
+
+    def sequenceFrameDecoded(self, frame):
+        isSequence = isinstance(self.frameReader, ImageSequenceReader)
+        if not isSequence or self.framePlayer.isPlaying():
+            return
+        current = self.timeSlider.value()
+        if (0 <= current < len(self.frameReader)
+                and self.frameReader.sourceFrame(current) == frame):
+            self.showSequenceFrame(current)
+
+    def showDecodedFrame(self, frame, decode=False):
+        """Show frame straight from the reader.
+
+        Args:
+            frame (int): Frame to show.
+            decode (bool, optional): Decode frame if needed, otherwise show it
+                only if already decoded.
+        """
+        if self.frameReader is None:
+            image = None
+        elif decode:
+            image = self.frameReader.read(frame)
+        else:
+            image = self.frameReader.peek(frame)
+        if image is None:
+            self.hideFrameView()
+            return
+        self.showFrame(image, frame)
+
+    def showFrame(self, image, frame):
+        self.frameView.setFrame(image, frame)
+        self.frameView.show()
+        self.frameView.raise_()
+        self.frameCounter.raise_()
+
+    def hideFrameView(self):
+        self.frameView.hide()
+        self.frameView.clear()
 
     def durationChanged(self, duration):
-        if duration:
-            frameRates = [60, 59.94, 50, 48, 47.952, 40, 30, 29.97,
-                          25, 24, 23.976, 20, 16, 15, 12, 10, 8, 6, 5, 4, 3, 2]
-            self.videoMeta.duration = duration / 1000
-            self.timeSlider.setRange(0, self.videoMeta.frameCount)
-
-            # Get frame rate
-            rate = self.videoMeta.frameCount / self.videoMeta.duration
-            self.videoMeta.frameRate = min(
-                frameRates, key=lambda x: abs(x - rate))
-            # Set media player update time
-            self.mediaPlayer.setNotifyInterval(
-                1 / self.videoMeta.frameRate * 1000)
-            self.frameRateLabel.setText(str(self.videoMeta.frameRate) + " fps")
-            self.playBackOffset.setText(str(0))
-            self.playBackOffset.setEnabled(True)
-            self.videoEnd.setText(str(self.videoMeta.frameCount))
-            self.playBackStart.setText(str(0))
-            self.playBackEnd.setText(str(self.videoMeta.frameCount))
-            self.frameCounter.setText(str(0))
-            self.frameCounter.setEnabled(True)
-            self.savePresetAction.setEnabled(True)
-            self.loadPresetAction.setEnabled(True)
+        if duration and self.mediaSwitch is not None:
+            # Same video switched to proxy, keep source duration and UI state
+            position = self.mediaSwitch[0]
+            self.mediaSwitch = None
+            self.mediaPlayer.setPosition(position)
+        elif duration:
+            self.engine.setDuration(duration / 1000)
+            self.resetTimeline()
+            if self.proxyPending:
+                self.proxyPending = False
+                self.startProxy()
+
+    def resetTimeline(self):
+        self.engine.resetRange()
+        self.timeSlider.setRange(
+            self.engine.playbackStart, self.engine.playbackEnd)
+        self.filmstrip.setRange(
+            self.engine.playbackStart, self.engine.playbackEnd)
+        self.frameRateLabel.setText(self.videoMeta.frameRateText())
+        self.playBackOffset.setText(str(self.engine.offset))
+        self.playBackOffset.setEnabled(True)
+        self.videoEnd.setText(str(self.videoMeta.frameCount))
+        self.playBackStart.setText(str(self.engine.playbackStart))
+        self.playBackEnd.setText(str(self.engine.playbackEnd))
+        self.frameCounter.setText(str(self.engine.currentFrame))
+        self.frameCounter.setEnabled(True)
+        self.savePresetAction.setEnabled(True)
+        self.loadPresetAction.setEnabled(True)
 
     def getFrames(self, filePath):
         try:
-            capture = cv2.VideoCapture(filePath)
-            success, image = capture.read()
+            frames = videoFn.countFrames(filePath)
         except Exception as e:
             logger.exception(
                 "Failed to read file {0}".format(filePath), exc_info=1)
             raise e
 
-        # Try fast count
-        frames = int(capture.get(cv2.CAP_PROP_FRAME_COUNT))
-        if not frames:
-            logger.warning(
-                "Failed to get frame count from meta data, counting frames...")
-            frames = 0
-            success = True
-            while success:
-                success, image = capture.read()
-                frames += 1
-
         return frames
 
     def positionToFrame(self, position):
-        if position:
-            progress = (position / 1000) / self.videoMeta.duration
-            frame = progress * self.videoMeta.frameCount
-            return frame
+        return self.engine.positionToFrame(position)
 
     def frameToPosition(self, frame):
-        progress = frame / self.videoMeta.frameCount
-        position = progress * self.videoMeta.duration * 1000
-        return int(position)
+        return self.engine.frameToPosition(frame)
 
     def stepFrameForward(self):
         nextFrame = self.timeSlider.value() + 1
@@ -513,15 +1136,13 @@ class Window(QtWidgets.QMainWindow):
         self.timeSlider.setValue(frame)
 
     def setRange(self):
-        playbackStart = int(self.playBackStart.text())
-        playbackEnd = int(self.playBackEnd.text())
-        if playbackStart > playbackEnd:
-            playbackStart = playbackEnd
-            self.playBackStart.setText(str(playbackEnd))
-        if playbackEnd < playbackStart:
-            playbackEnd = playbackStart
-            self.playBackEnd.setText(str(playbackStart))
+        playbackStart, playbackEnd = self.engine.setRange(
+            int(self.playBackStart.text()), int(self.playBackEnd.text()))
+        self.playBackStart.setText(str(playbackStart))
+        self.playBackEnd.setText(str(playbackEnd))
         self.timeSlider.setRange(playbackStart, playbackEnd)
+        self.filmstrip.setRange(playbackStart, playbackEnd)
+        self.framePlayer.setLastFrame(playbackEnd)
         self.setPosition(self.timeSlider.value())
 
     def toStart(self):
@@ -574,39 +1195,62 @@ class Window(QtWidgets.QMainWindow):
         self.setRange()
 
     def negatePlayBackStart(self):
-        negatedStart = int(self.playBackStart.text()) * -1
-        self.playBackOffset.setText(str(negatedStart))
+        self.playBackOffset.setText(str(self.engine.negatePlaybackStart()))
 
     def setMayaPlaybackOptions(self):
-        unitLookUp = {15: "game",
-                      24: "film",
-                      25: "pal",
-                      30: "ntsc",
-                      48: "show",
-                      50: "palf",
-                      60: "ntscf"}
-
-        if self.mayaClient.connect() and self.videoMeta:
-            # Set framerate
-            if self.videoMeta.frameRate in unitLookUp.keys():
-                unitName = unitLookUp[self.videoMeta.frameRate]
-                cmd = "maya.cmds.currentUnit(time='{0}')".format(unitName)
-                self.mayaClient.send(cmd)
-
-            # Set animation end
-            cmd = "maya.cmds.playbackOptions(aet={0}, e=1)".format(
-                self.videoMeta.frameCount)
-            self.mayaClient.send(cmd)
-            # Set playback start
-            cmd = "maya.cmds.playbackOptions(min={0}, e=1)".format(
-                float(self.playBackStart.text()) + float(self.playBackOffset.text()))
-            self.mayaClient.send(cmd)
-            # Set playback end
-            cmd = "maya.cmds.playbackOptions(max={0}, e=1)".format(
-                float(self.playBackEnd.text()) - float(self.playBackStart.text()))
-            self.mayaClient.send(cmd)
+        future = self.engine.matchPlaybackOptions(
+            callback=self.mayaPlaybackOptionsSet)
+        if future is None:
+            self.mayaConnectionLost()
+
+    def mayaPlaybackOptionsSet(self, results):
+        if results is None:
+            self.statusBar.showMessage(
+                "Failed to set Maya playback options", 5000)
+            return
+
+        failed = [result for result in results if not result.success]
+        for result in failed:
+            logger.error(
+                f"Maya command failed: {result.command} - {result.error}")
+        if failed:
+            self.statusBar.showMessage(
+                f"Failed to set {len(failed)} of Maya playback options", 5000)
         else:
-            self.timeSlider.valueChanged.disconnect()
+            self.statusBar.showMessage("Maya playback options set", 4000)
+
+    def closeEvent(self, event):
+        self.framePlayer.stop()
+        if self.probeWorker:
+            worker = self.probeWorker
+            self.cancelProbe()
+            worker.wait()
+        if self.keyframeWorker:
+            worker = self.keyframeWorker
+            self.cancelKeyframeIndex()
+            worker.wait()
+        if self.proxyWorker:
+            worker = self.proxyWorker
+            self.cancelProxy()
+            worker.wait()
+        if self.thumbnailWorker:
+            worker = self.thumbnailWorker
+            self.cancelThumbnails()
+            worker.wait()
+        if self.frameStoreWorker:
+            worker = self.frameStoreWorker
+            self.cancelFrameStore()
+            worker.wait()
+        if self.prefetcher:
+            self.prefetcher.stop()
+        if self.frameReader:
+            self.frameReader.close()
+        self.frameView.stop()
+        self.engine.close()
+        if self.engine.syncStats():
+            logger.info(
+                f"Maya sync stats: {self.engine.syncStats().summary()}")
+        super(Window, self).closeEvent(event)
 
     def changeMayaPort(self):
         currentPort = str(self.settings.current["port"])
@@ -624,14 +1268,23 @@ class Window(QtWidgets.QMainWindow):
 
     def updateConnectionStatus(self):
         # UTILS
-        if self.connected:
+        if self.engine.connected:
+            self.syncStatsTimer.start()
             self.syncCheckBox.setEnabled(True)
             self.statusBar.showMessage("*Connected to Maya", 5000)
         else:
+            self.syncStatsTimer.stop()
             self.syncCheckBox.setEnabled(False)
             self.syncCheckBox.setChecked(False)
             self.statusBar.showMessage("*Not Connected", 5000)
 
+    def updateSyncStats(self):
+        if self.engine.syncStats():
+            self.syncStatsLabel.setText(self.engine.syncStats().summary())
+
+    def updatePlaybackStats(self):
+        self.playbackStatsLabel.setText(self.framePlayer.stats.summary())
+
     def hideEmptyStatusBar(self, msg):
         if not msg and not self.statusBarAction.isChecked():
             self.statusBar.setVisible(False)
@@ -643,6 +1296,9 @@ class Window(QtWidgets.QMainWindow):
         aboutDialog.setWindowTitle("About")
         aboutDialog.setText(
             "Author: Dmitrii Shevchenko\nVersion: {0}".format(self.version))
+        if self.startupTime is not None:
+            aboutDialog.setInformativeText(
+                "Started in {0:.0f} ms".format(self.startupTime * 1000))
         aboutDialog.exec_()
 
     def showCommandPortHelp(self):
@@ -681,75 +1337,9 @@ class Window(QtWidgets.QMainWindow):
             self.setRange()
 
 
-class MayaClient(object):
-    """[summary]
-
-    Args:
-        object ([type]): [description]
-    """
-    BUFFER_SIZE = 4096
-
-    def __init__(self, port=7221):
-        self.port = port
-        self.mayaSocket = None
-
-    def connect(self, port=-1):
-        if port >= 0:
-            self.port = port
-
-        try:
-            self.mayaSocket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-            self.mayaSocket.connect(("localhost", self.port))
-        except Exception as e:
-            logger.exception("Failed to create socket", exc_info=1)
-            return False
-
-        return True
-
-    def disconnect(self):
-        try:
-            self.mayaSocket.close()
-        except Exception as e:
-            logger.exception("Failed to disconnect socket", exc_info=1)
-            return False
-
-        return True
-
-    def send(self, cmd):
-        try:
-            self.mayaSocket.sendall(cmd.encode())
-        except Exception as e:
-            logger.exception(
-                "Failed to send command: {0}".format(cmd), exc_info=1)
-            return None
-        return self.recv()
-
-    def recv(self):
-        try:
-            data = self.mayaSocket.recv(MayaClient.BUFFER_SIZE)
-        except Exception as e:
-            logger.exception("Failed to recieve data", exc_info=1)
-            return None
-
-        return data.decode().replace("\x00", "")
-
-    # ----------------------------------------------------------------------------
-    # COMMANDS
-    # ----------------------------------------------------------------------------
-
-    # Add command methods here
-    def echo(self, text):
-        cmd = "eval(\"'{0}'\")".format(text)
-
-        return self.send(cmd)
-
-    def setCurrentTime(self, frame):
-        cmd = "cmds.currentTime({})".format(frame)
-
-        return self.send(cmd)
-
-
 if __name__ == '__main__':
+    # Frame counting spawns worker processes, required for frozen executable
+    multiprocessing.freeze_support()
     app = QtWidgets.QApplication(os.sys.argv)
     app.setStyle(QtWidgets.QStyleFactory.create("fusion"))
 
@@ -777,5 +1367,7 @@ if __name__ == '__main__':
     window = Window()
     window.resize(600, 400)
     window.show()
+    # Runs once the window has been shown and events are processed
+    QtCore.QTimer.singleShot(0, window.windowReady)
 
     app.exec_()
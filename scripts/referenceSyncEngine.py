@@ -0,0 +1,338 @@
+import math
+import bisect
+import logging
+import fractions
+from scripts.mayaClient import MayaClient
+from scripts.syncDispatcher import SyncDispatcher
+from scripts.playbackClock import PlaybackClock
+
+# Logger
+logger = logging.getLogger(__name__)
+
+# Guessed from frame count and duration when video does not report its rate
+COMMON_FRAME_RATES = tuple(fractions.Fraction(rate) for rate in (
+    60, "60000/1001", 50, 48, "48000/1001", 40, 30, "30000/1001",
+    25, 24, "24000/1001", 20, 16, 15, 12, 10, 8, 6, 5, 4, 3, 2))
+# Maya time units of frame rates it has presets for
+MAYA_TIME_UNITS = {fractions.Fraction(15): "game",
+                   fractions.Fraction(24): "film",
+                   fractions.Fraction(25): "pal",
+                   fractions.Fraction(30): "ntsc",
+                   fractions.Fraction(48): "show",
+                   fractions.Fraction(50): "palf",
+                   fractions.Fraction(60): "ntscf",
+                   fractions.Fraction(24000, 1001): "23.976fps",
+                   fractions.Fraction(30000, 1001): "29.97fps",
+                   fractions.Fraction(48000, 1001): "47.952fps",
+                   fractions.Fraction(60000, 1001): "59.94fps"}
+
+
+class VideoMeta(object):
+    """Metadata of opened video or image sequence and frame/time mapping."""
+
+    def __init__(self):
+        self.readFlag = None
+        self.path = None
+        self.frameCount = None
+        self.duration = None
+        # Exact rate as fractions.Fraction
+        self.frameRate = None
+        self.variableFrameRate = False
+        self.resolution = None
+        # Numbered image files instead of a movie
+        self.isSequence = False
+        # Number of the first frame, default playback offset
+        self.firstFrame = 0
+        # Presentation time of every frame in microseconds (array.array), if
+        # indexed
+        self.timestamps = None
+
+    def frameRateText(self):
+        if not self.frameRate:
+            return ""
+        if self.frameRate.denominator == 1:
+            text = f"{self.frameRate.numerator} fps"
+        else:
+            text = f"{float(self.frameRate):.3f}".rstrip("0") + " fps"
+        if self.variableFrameRate:
+            text = "VFR ~" + text
+        return text
+
+    def positionToFrame(self, position):
+        """Frame shown at position in milliseconds."""
+        if self.timestamps:
+            frame = bisect.bisect_right(self.timestamps, position * 1000) - 1
+            return max(0, frame)
+        if self.frameRate and not self.variableFrameRate:
+            # Integer math, no accumulated float error
+            rate = self.frameRate
+            return position * rate.numerator // (1000 * rate.denominator)
+        # Same operation order as frameToPosition, so rounding can't break the
+        # round trip
+        return int(position * self.frameCount / (self.duration * 1000))
+
+    def frameToPosition(self, frame):
+        """First whole millisecond at which frame is shown."""
+        if self.timestamps:
+            frame = min(max(0, frame), len(self.timestamps) - 1)
+            return -(-self.timestamps[frame] // 1000)
+        if self.frameRate and not self.variableFrameRate:
+            rate = self.frameRate
+            return -(-frame * 1000 * rate.denominator // rate.numerator)
+        position = math.ceil(frame * self.duration * 1000 / self.frameCount)
+        # Float error can move the product across a whole millisecond, result
+        # has to agree with positionToFrame
+        while position > 0 and self.positionToFrame(position - 1) >= frame:
+            position -= 1
+        while self.positionToFrame(position) < frame:
+            position += 1
+        return position
+
+
+class ReferenceSyncEngine(object):
+    """Timing, playback range and Maya sync of a reference, without any UI.
+
+    Owns metadata of the opened video, frame/time mapping, playback range
+    and offset, the playback clock and the channel syncing Maya's time
+    slider. Frames are numbered from 0 at the first frame of the video,
+    Maya frame is player frame plus offset. Nothing here depends on Qt, so
+    the engine can be driven from scripts and tools as well as by the
+    player window.
+
+    Args:
+        port (int, optional): Maya command port.
+        callbackInvoker (callable, optional): Passed to MayaClient, lets Maya
+            callbacks be called on caller's thread.
+        onSyncError (callable, optional): Called from network thread when
+            connection is lost while syncing.
+    """
+
+    def __init__(self, port=7221, callbackInvoker=None, onSyncError=None):
+        self.port = port
+        self.callbackInvoker = callbackInvoker
+        self.onSyncError = onSyncError
+        self.videoMeta = VideoMeta()
+        self.playbackStart = 0
+        self.playbackEnd = 0
+        self.offset = 0
+        self.currentFrame = 0
+        self.syncEnabled = False
+        self.connected = False
+        self.mayaClient = None
+        self.syncDispatcher = None
+
+    # ----------------------------------------------------------------------------
+    # VIDEO
+    # ----------------------------------------------------------------------------
+    def loadVideo(self, fileName, meta, timestamps=None):
+        """Use metadata of a probed video.
+
+        Args:
+            fileName (str): Path to video file.
+            meta (dict): Metadata as returned by videoFn.probe or stored in
+                MetadataCache.
+            timestamps (array.array, optional): Per frame presentation time
+                index.
+
+        Returns:
+            VideoMeta: Metadata of the video.
+        """
+        videoMeta = VideoMeta()
+        videoMeta.path = fileName
+        videoMeta.frameCount = meta["frameCount"]
+        videoMeta.duration = meta["duration"]
+        videoMeta.frameRate = None
+        if meta["frameRate"]:
+            videoMeta.frameRate = fractions.Fraction(meta["frameRate"])
+        videoMeta.variableFrameRate = meta["variableFrameRate"]
+        videoMeta.timestamps = timestamps
+        videoMeta.resolution = tuple(meta["resolution"])
+        self.videoMeta = videoMeta
+        self.resetRange()
+        return videoMeta
+
+    def loadSequence(self, fileName, frameCount, frameRate, firstFrame=0):
+        """Use image sequence of frameCount frames played at frameRate.
+
+        Args:
+            fileName (str): Path to any frame of the sequence.
+            frameCount (int): Number of frames from first to last frame number.
+            frameRate (Fraction): Playback frame rate.
+            firstFrame (int, optional): Number of the first frame, Maya frames
+                are offset by it.
+
+        Returns:
+            VideoMeta: Metadata of the sequence, resolution is left to be
+                filled in.
+        """
+        videoMeta = VideoMeta()
+        videoMeta.path = fileName
+        videoMeta.isSequence = True
+        videoMeta.firstFrame = firstFrame
+        videoMeta.frameCount = frameCount
+        videoMeta.frameRate = fractions.Fraction(frameRate)
+        videoMeta.duration = float(frameCount / videoMeta.frameRate)
+        self.videoMeta = videoMeta
+        self.resetRange()
+        return videoMeta
+
+    def setDuration(self, duration):
+        """Set duration in seconds reported by the media backend.
+
+        Frame rate is guessed from it if video did not report one.
+        """
+        self.videoMeta.duration = duration
+        if not self.videoMeta.frameRate and self.videoMeta.frameCount:
+            rate = self.videoMeta.frameCount / duration
+            self.videoMeta.frameRate = min(
+                COMMON_FRAME_RATES, key=lambda x: abs(x - rate))
+
+    def positionToFrame(self, position):
+        if self.videoMeta.duration:
+            return self.videoMeta.positionToFrame(position)
+
+    def frameToPosition(self, frame):
+        return self.videoMeta.frameToPosition(frame)
+
+    def createClock(self):
+        """New playback clock of the opened video.
+
+        Returns:
+            PlaybackClock: Clock or None if video can't be timed.
+        """
+        if not self.videoMeta.frameRate and not self.videoMeta.timestamps:
+            return None
+        return PlaybackClock(
+            self.videoMeta.frameRate, self.videoMeta.timestamps)
+
+    # ----------------------------------------------------------------------------
+    # RANGE
+    # ----------------------------------------------------------------------------
+    def resetRange(self):
+        self.playbackStart = 0
+        self.playbackEnd = self.videoMeta.frameCount or 0
+        self.offset = self.videoMeta.firstFrame
+        self.currentFrame = 0
+
+    def setRange(self, start, end):
+        """Set playback range, start is clamped to end.
+
+        Returns:
+            tuple: (start, end) actually set.
+        """
+        self.playbackStart = min(start, end)
+        self.playbackEnd = end
+        self.currentFrame = min(
+            max(self.currentFrame, self.playbackStart), self.playbackEnd)
+        return self.playbackStart, self.playbackEnd
+
+    def setOffset(self, offset):
+        self.offset = offset
+
+    def negatePlaybackStart(self):
+        """Set offset so playback start lands on Maya frame 0.
+
+        Returns:
+            int: New offset.
+        """
+        self.offset = -self.playbackStart
+        return self.offset
+
+    def mayaFrame(self, frame=None):
+        """Maya frame of player frame, current frame by default."""
+        return self.offset + (self.currentFrame if frame is None else frame)
+
+    def mayaPlaybackRange(self):
+        """Start and end of Maya's playback slider matching playback range."""
+        start = self.playbackStart + self.offset
+        return start, self.playbackEnd - self.playbackStart
+
+    # ----------------------------------------------------------------------------
+    # MAYA
+    # ----------------------------------------------------------------------------
+    def connect(self, port=None, callback=None):
+        """Connect to Maya without blocking, sync dispatcher is started once connected.
+
+        Args:
+            port (int, optional): Change port before connecting.
+            callback (callable, optional): Called with connection success.
+
+        Returns:
+            concurrent.futures.Future: Resolves to connection success.
+        """
+        if port is not None:
+            self.port = port
+        if self.mayaClient is None:
+            self.mayaClient = MayaClient(
+                port=self.port, callbackInvoker=self.callbackInvoker)
+            self.syncDispatcher = SyncDispatcher(
+                self.mayaClient, onError=self.onSyncError)
+        return self.mayaClient.connectAsync(
+            self.port,
+            callback=lambda success: self._connected(success, callback))
+
+    def _connected(self, success, callback):
+        self.connected = bool(success)
+        if self.connected:
+            self.syncDispatcher.start()
+        if callback:
+            callback(success)
+
+    def connectionLost(self):
+        self.connected = False
+        if self.syncDispatcher:
+            self.syncDispatcher.stop()
+
+    def setSyncEnabled(self, state):
+        self.syncEnabled = bool(state)
+
+    def setFrame(self, frame):
+        """Set current frame, syncing it to Maya if sync is enabled."""
+        self.currentFrame = frame
+        self.syncFrame()
+
+    def syncFrame(self):
+        if self.syncEnabled and self.connected:
+            self.syncDispatcher.submit(self.mayaFrame())
+
+    def matchPlaybackOptions(self, callback=None):
+        """Match Maya's frame rate, animation length and playback range.
+
+        Args:
+            callback (callable, optional): Called with list of CommandResult or
+                None on failure.
+
+        Returns:
+            concurrent.futures.Future: Resolves to list of CommandResult, None
+                if not connected.
+        """
+        if not self.connected:
+            return None
+        batch = self.mayaClient.batch()
+        # Set framerate
+        if self.videoMeta.frameRate in MAYA_TIME_UNITS:
+            timeUnit = MAYA_TIME_UNITS[self.videoMeta.frameRate]
+            batch.add("maya.cmds.currentUnit(time='{0}')".format(timeUnit))
+        start, end = self.mayaPlaybackRange()
+        # Set animation end
+        batch.add(
+            "maya.cmds.playbackOptions(aet={0}, e=1)".format(
+                self.videoMeta.frameCount))
+        # Set playback start
+        batch.add(
+            "maya.cmds.playbackOptions(min={0}, e=1)".format(float(start)))
+        # Set playback end
+        batch.add("maya.cmds.playbackOptions(max={0}, e=1)".format(float(end)))
+        return batch.sendAsync(callback=callback)
+
+    def syncStats(self):
+        """SyncStats of Maya connection, None if never connected."""
+        return self.mayaClient.stats if self.mayaClient else None
+
+    def close(self):
+        """Stop syncing and close Maya connection."""
+        if self.syncDispatcher:
+            self.syncDispatcher.stop()
+        if self.mayaClient:
+            self.mayaClient.close()
+        self.connected = False
@@ -0,0 +1,91 @@
+import os
+import re
+import logging
+
+# Logger
+logger = logging.getLogger(__name__)
+
+SEQUENCE_EXTENSIONS = (
+    ".png", ".jpg", ".jpeg", ".exr", ".tif", ".tiff", ".dpx")
+# Last group of digits in file name is the frame number
+FRAME_NUMBER_PATTERN = re.compile(r"^(.*?)(\d+)(\D*)$")
+
+
+def isSequenceFile(filePath):
+    return os.path.splitext(filePath)[1].lower() in SEQUENCE_EXTENSIONS
+
+
+def splitFrameNumber(fileName):
+    """Split file name into prefix, frame number and suffix.
+
+    Args:
+        fileName (str): File name, for example "shot_0101.exr".
+
+    Returns:
+        tuple: ("shot_", "0101", ".exr") or None if name has no frame number.
+    """
+    stem, extension = os.path.splitext(fileName)
+    match = FRAME_NUMBER_PATTERN.match(stem)
+    if not match:
+        return None
+    prefix, number, suffix = match.groups()
+    return prefix, number, suffix + extension
+
+
+def detectSequence(filePath):
+    """Find all frames of the sequence filePath belongs to.
+
+    Directory is listed once with scandir, so files are not stat-ed one by
+    one. Frames are ordered by frame number, any padding is accepted.
+
+    Args:
+        filePath (str): Path to any frame of the sequence.
+
+    Returns:
+        tuple: (list of frame numbers, list of frame paths) in frame order.
+            Single frame if file name has no frame number.
+    """
+    directory, fileName = os.path.split(os.path.abspath(filePath))
+    parts = splitFrameNumber(fileName)
+    if parts is None:
+        return [0], [filePath]
+
+    prefix, _, suffix = parts
+    pattern = re.compile(
+        r"^{0}(\d+){1}$".format(re.escape(prefix), re.escape(suffix)))
+    frames = []
+    with os.scandir(directory) as entries:
+        for entry in entries:
+            match = pattern.match(entry.name)
+            if match and entry.is_file():
+                frames.append((int(match.group(1)), entry.path))
+    frames.sort()
+
+    numbers = [number for number, _ in frames]
+    missing = numbers[-1] - numbers[0] + 1 - len(numbers)
+    if missing:
+        logger.warning(
+            f"Sequence {prefix}#{suffix} is missing {missing} frames, gaps "
+            "hold previous frame")
+    return numbers, [path for _, path in frames]
+
+
+def fillGaps(numbers, paths):
+    """Path of every frame number from first to last.
+
+    Missing numbers hold the previous frame, which keeps frames after a gap at
+    the time their number says.
+
+    Args:
+        numbers (list): Sorted frame numbers as returned by detectSequence.
+        paths (list): Frame paths as returned by detectSequence.
+
+    Returns:
+        list: Frame paths, one per frame number starting at numbers[0].
+    """
+    filled = []
+    for number, path in zip(numbers, paths):
+        while len(filled) < number - numbers[0]:
+            filled.append(filled[-1])
+        filled.append(path)
+    return filled
@@ -0,0 +1,200 @@
+import os
+import time
+import logging
+import threading
+import multiprocessing
+import concurrent.futures
+from scripts import lazyImport
+from scripts.frameCache import FrameCache
+
+# EXR support is off by default and read when the first EXR is decoded
+os.environ.setdefault("OPENCV_IO_ENABLE_OPENEXR", "1")
+numpy = lazyImport.LazyModule("numpy")
+cv2 = lazyImport.LazyModule("cv2")
+
+# Logger
+logger = logging.getLogger(__name__)
+
+
+def readImage(path):
+    """Read image as 8 bit BGR NumPy array.
+
+    High bit depth images are reduced to 8 bit, floating point (EXR) images
+    are treated as linear and converted to display gamma.
+
+    Returns:
+        numpy.ndarray: Image or None if it could not be read.
+    """
+    image = cv2.imread(path, cv2.IMREAD_COLOR | cv2.IMREAD_ANYDEPTH)
+    if image is None:
+        return None
+    if image.dtype == numpy.uint16:
+        image = (image >> 8).astype(numpy.uint8)
+    elif image.dtype != numpy.uint8:
+        image = numpy.clip(image, 0.0, 1.0) ** (1 / 2.2)
+        image = (image * 255 + 0.5).astype(numpy.uint8)
+    return image
+
+
+class ImageSequenceReader(object):
+    """Random access to decoded frames of an image sequence through a frame cache.
+
+    Frames are decoded by a thread pool. Every read schedules decoding of the
+    next readAhead frames in the direction frames are being read, so during
+    playback frames are usually decoded before they are asked for. Frames
+    repeating the path of the previous frame (gaps filled by
+    sequenceFn.fillGaps) share its cache entry and are decoded once.
+
+    Has the same reading interface as VideoFrameReader.
+
+    Args:
+        paths (list): Frame paths in frame order.
+        cache (FrameCache, optional): Cache to use, new cache with default
+            budget if not set.
+        workers (int, optional): Decoding threads. Defaults to cpu count.
+        readAhead (int, optional): Frames decoded ahead of the last read frame.
+        onDecoded (callable, optional): Called from decoding thread with frame
+            number of every cached frame (see sourceFrame).
+    """
+    READ_AHEAD = 12
+
+    def __init__(self, paths, cache=None, workers=None, readAhead=READ_AHEAD,
+                 onDecoded=None):
+        self.paths = list(paths)
+        self.cache = cache if cache is not None else FrameCache()
+        self.readAhead = readAhead
+        self.onDecoded = onDecoded
+        # Every frame is a keyframe
+        self.keyframes = None
+        # Exponential moving average, seconds
+        self.decodeTime = None
+        # First frame showing the same file, used as cache key
+        self._sources = []
+        for frame, path in enumerate(self.paths):
+            held = frame and path == self.paths[frame - 1]
+            self._sources.append(self._sources[-1] if held else frame)
+        workers = workers or multiprocessing.cpu_count()
+        self._executor = concurrent.futures.ThreadPoolExecutor(
+            workers, thread_name_prefix="SequenceReader")
+        self._pending = {}
+        self._lastFrame = None
+        self._closed = False
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self.paths)
+
+    def sourceFrame(self, frame):
+        """First frame showing the same file as frame, frame cache key."""
+        return self._sources[frame]
+
+    def read(self, frame):
+        """Decoded frame as BGR NumPy array.
+
+        Args:
+            frame (int): Frame index in the sequence.
+
+        Returns:
+            numpy.ndarray: Frame or None if it could not be read.
+        """
+        if not 0 <= frame < len(self.paths):
+            return None
+        image = self.cache.get(self._sources[frame])
+        if image is None:
+            future = self._schedule(self._sources[frame])
+            image = future.result() if future else None
+        self._readAhead(frame)
+        return image
+
+    def peek(self, frame):
+        """Frame only if it is available without decoding, None otherwise."""
+        if not 0 <= frame < len(self.paths):
+            return None
+        return self.cache.get(self._sources[frame])
+
+    def peekNearest(self, frame, distance=READ_AHEAD):
+        """Cached frame closest to frame, looking at most distance frames away.
+
+        Returns:
+            tuple: (frame, image), (None, None) if no frame is cached nearby.
+        """
+        for offset in range(distance + 1):
+            for target in (frame - offset, frame + offset):
+                image = self.peek(target)
+                if image is not None:
+                    return target, image
+        return None, None
+
+    def prefetch(self, frame):
+        """Schedule decoding of frame and frames ahead without waiting."""
+        if not 0 <= frame < len(self.paths):
+            return
+        if self._sources[frame] not in self.cache:
+            self._schedule(self._sources[frame])
+        self._readAhead(frame)
+
+    def keyframeBefore(self, frame):
+        return frame
+
+    def seekCost(self, frame):
+        if self._sources[frame] in self.cache:
+            return 0
+        return 1
+
+    def close(self):
+        with self._lock:
+            # Decodes already running must not fill shared cache once it
+            # belongs to the next reader
+            self._closed = True
+            for future in self._pending.values():
+                future.cancel()
+            self._pending.clear()
+        self._executor.shutdown(wait=False)
+
+    def _readAhead(self, frame):
+        backwards = self._lastFrame is not None and frame < self._lastFrame
+        step = -1 if backwards else 1
+        self._lastFrame = frame
+        for offset in range(1, self.readAhead + 1):
+            target = frame + offset * step
+            if not 0 <= target < len(self.paths):
+                break
+            if self._sources[target] not in self.cache:
+                self._schedule(self._sources[target])
+
+    def _schedule(self, source):
+        with self._lock:
+            future = self._pending.get(source)
+            if future is None:
+                try:
+                    future = self._executor.submit(self._decode, source)
+                except RuntimeError:
+                    # Reader was closed
+                    return None
+                self._pending[source] = future
+            return future
+
+    def _decode(self, source):
+        start = time.perf_counter()
+        try:
+            image = readImage(self.paths[source])
+            if image is None:
+                logger.warning(f"Failed to read frame {self.paths[source]}")
+                return None
+            with self._lock:
+                if self._closed:
+                    return None
+                self.cache.put(source, image)
+            self._recordDecodeTime(time.perf_counter() - start)
+            if self.onDecoded:
+                self.onDecoded(source)
+            return image
+        finally:
+            with self._lock:
+                self._pending.pop(source, None)
+
+    def _recordDecodeTime(self, seconds):
+        if self.decodeTime is None:
+            self.decodeTime = seconds
+        else:
+            self.decodeTime += (seconds - self.decodeTime) * 0.2
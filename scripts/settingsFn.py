@@ -5,7 +5,13 @@ import json
 class Settings:
     DEFAULTS = {"port": 7221,
                 "alwaysOnTop": True,
-                "connectOnStart": False}
+                "connectOnStart": False,
+                "frameCacheMb": 512,
+                "generateProxy": False,
+                "proxyMaxWidth": 960,
+                "rawFrameStore": False,
+                "rawFrameStoreMaxMb": 2048,
+                "sequenceFrameRate": 24}
 
     def __init__(self):
         self.directory = os.path.join(os.getenv("LOCALAPPDATA"), "dsReferencePlayer")
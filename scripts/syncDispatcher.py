@@ -0,0 +1,114 @@
+import logging
+import threading
+
+# Logger
+logger = logging.getLogger(__name__)
+
+
+class SyncDispatcher(object):
+    """Sends current frame to Maya without blocking the caller.
+
+    Frame commands are pipelined, up to maxInFlight of them may wait for
+    Maya's reply at once. While the window is full only the newest submitted
+    frame is kept, frames in between are dropped and counted in client stats.
+    This keeps Maya at most maxInFlight commands behind the player while
+    sending faster than one frame per round trip. Commands are sent from
+    MayaClient's network thread.
+
+    A failed frame command (error reply or timeout) is only counted in client
+    stats, onError is called only when Maya can't be reconnected to after it,
+    so one bad reply does not end the sync session.
+
+    Args:
+        client (MayaClient): Client used to send commands.
+        onError (callable, optional): Called from network thread when
+            connection to Maya is lost.
+        maxInFlight (int, optional): Frame commands allowed to wait for reply
+            at once.
+    """
+    MAX_IN_FLIGHT = 2
+
+    def __init__(self, client, onError=None, maxInFlight=MAX_IN_FLIGHT):
+        self.client = client
+        self.onError = onError
+        self.maxInFlight = max(1, maxInFlight)
+        self._pending = None
+        self._inFlight = 0
+        self._running = False
+        self._lock = threading.Lock()
+
+    def start(self):
+        with self._lock:
+            self._running = True
+
+    def stop(self):
+        with self._lock:
+            self._running = False
+            self._pending = None
+
+    def isRunning(self):
+        return self._running
+
+    def isIdle(self):
+        """True if no frame is waiting to be sent or for Maya's reply."""
+        with self._lock:
+            return self._pending is None and self._inFlight == 0
+
+    def submit(self, frame):
+        """Queue frame to be sent, replacing any frame not yet sent.
+
+        Args:
+            frame (int): Frame to set in Maya.
+        """
+        with self._lock:
+            if not self._running:
+                return
+            if self._inFlight >= self.maxInFlight:
+                if self._pending is not None:
+                    self.client.stats.recordDropped()
+                self._pending = frame
+                return
+            self._inFlight += 1
+        self._send(frame)
+
+    def _send(self, frame):
+        future = self.client.setCurrentTime(frame)
+        future.add_done_callback(lambda done: self._sent(frame, done))
+
+    def _checkConnection(self):
+        """Report lost connection if Maya can't be reached anymore."""
+        if self.onError and self._running:
+            self.client.connectAsync().add_done_callback(self._reconnected)
+
+    def _reconnected(self, future):
+        if (future.cancelled() or future.exception() is not None
+                or not future.result()):
+            logger.error("Lost connection to Maya while syncing")
+            if self.onError and self._running:
+                self.onError()
+
+    def _sent(self, frame, future):
+        try:
+            if future.cancelled():
+                logger.error("Syncing frame {0} was cancelled".format(frame))
+                self.client.stats.recordFailed()
+            elif future.exception() is not None:
+                logger.error(
+                    "Failed to sync frame {0}: {1!r}".format(
+                        frame, future.exception()))
+                self.client.stats.recordFailed()
+                self._checkConnection()
+            elif future.result() is None:
+                # Already counted as failed by the client
+                logger.error("Failed to sync frame {0}".format(frame))
+                self._checkConnection()
+        finally:
+            # Window slot is released whatever happened to the command
+            with self._lock:
+                frame = self._pending
+                self._pending = None
+                if frame is None or not self._running:
+                    self._inFlight -= 1
+                    frame = None
+        if frame is not None:
+            self._send(frame)
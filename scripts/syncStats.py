@@ -0,0 +1,125 @@
+import math
+import bisect
+import threading
+
+
+class LatencyHistogram(object):
+    """Fixed-size histogram of latencies in milliseconds.
+
+    Bucket upper bounds double from 0.25 ms to ~8 s, anything slower goes
+    to an overflow bucket. Memory use does not grow with number of samples.
+    """
+    BUCKET_BOUNDS = tuple(0.25 * 2 ** i for i in range(16))
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        self.counts = [0] * (len(self.BUCKET_BOUNDS) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.minimum = None
+        self.maximum = None
+
+    def record(self, milliseconds):
+        self.counts[bisect.bisect_left(self.BUCKET_BOUNDS, milliseconds)] += 1
+        self.count += 1
+        self.total += milliseconds
+        if self.minimum is None or milliseconds < self.minimum:
+            self.minimum = milliseconds
+        if self.maximum is None or milliseconds > self.maximum:
+            self.maximum = milliseconds
+
+    def mean(self):
+        return self.total / self.count if self.count else None
+
+    def percentile(self, percent):
+        """Estimate percentile as upper bound of the bucket it falls into.
+
+        Args:
+            percent (float): Percentile in 0-100 range.
+
+        Returns:
+            float: Latency in milliseconds or None if nothing was recorded.
+        """
+        if not self.count:
+            return None
+        rank = max(1, math.ceil(percent / 100.0 * self.count))
+        cumulative = 0
+        for index, bucketCount in enumerate(self.counts):
+            cumulative += bucketCount
+            if cumulative >= rank:
+                break
+        if index >= len(self.BUCKET_BOUNDS):
+            return self.maximum
+        return min(self.BUCKET_BOUNDS[index], self.maximum)
+
+    def buckets(self):
+        """List of (upper bound in ms, count) pairs, last bound is inf."""
+        bounds = list(self.BUCKET_BOUNDS) + [float("inf")]
+        return list(zip(bounds, self.counts))
+
+
+class SyncStats(object):
+    """Thread-safe counters and round-trip latency histogram of commands."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.rtt = LatencyHistogram()
+            self.sent = 0
+            self.dropped = 0
+            self.failed = 0
+            self.bytesIn = 0
+            self.bytesOut = 0
+
+    def recordSent(self, numBytes):
+        with self._lock:
+            self.sent += 1
+            self.bytesOut += numBytes
+
+    def recordReply(self, numBytes, milliseconds):
+        with self._lock:
+            self.bytesIn += numBytes
+            self.rtt.record(milliseconds)
+
+    def recordDropped(self, count=1):
+        with self._lock:
+            self.dropped += count
+
+    def recordFailed(self, count=1):
+        with self._lock:
+            self.failed += count
+
+    def snapshot(self):
+        """Current values as a plain dict."""
+        with self._lock:
+            return {"sent": self.sent,
+                    "dropped": self.dropped,
+                    "failed": self.failed,
+                    "bytesIn": self.bytesIn,
+                    "bytesOut": self.bytesOut,
+                    "replies": self.rtt.count,
+                    "rttMean": self.rtt.mean(),
+                    "rttMin": self.rtt.minimum,
+                    "rttMax": self.rtt.maximum,
+                    "rttP50": self.rtt.percentile(50),
+                    "rttP95": self.rtt.percentile(95),
+                    "rttP99": self.rtt.percentile(99),
+                    "rttBuckets": self.rtt.buckets()}
+
+    def summary(self):
+        """Short human readable summary for status bar and log."""
+        data = self.snapshot()
+        if data["replies"]:
+            rtt = "RTT p50 {0:.2f} ms, p95 {1:.2f} ms, max {2:.2f} ms".format(
+                data["rttP50"], data["rttP95"], data["rttMax"])
+        else:
+            rtt = "RTT n/a"
+        return ("{0} | sent {1}, dropped {2}, failed {3} | "
+                "in {4} B, out {5} B").format(
+            rtt, data["sent"], data["dropped"], data["failed"],
+            data["bytesIn"], data["bytesOut"])
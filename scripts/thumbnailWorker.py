@@ -0,0 +1,106 @@
+import os
+import logging
+import threading
+import multiprocessing
+import concurrent.futures
+from PySide2 import QtCore, QtGui
+from scripts import videoFn
+
+# Logger
+logger = logging.getLogger(__name__)
+
+
+class ThumbnailWorker(QtCore.QThread):
+    """Generates filmstrip thumbnails in background thread.
+
+    Thumbnails already cached on disk are loaded first, missing ones are
+    decoded in chunks by a process pool and written to cache as they arrive.
+    Each thumbnail is emitted as soon as it is ready, as a QImage so the GUI
+    thread does not have to decode anything.
+
+    Args:
+        filePath (str): Path to video file.
+        frameCount (int): Number of frames in the video.
+        cacheDirectory (str): Directory thumbnails are cached in.
+        count (int, optional): Number of thumbnails.
+        height (int, optional): Thumbnail height in pixels.
+        workers (int, optional): Max number of decoding processes. Defaults to
+            cpu count.
+        parent (QObject, optional): Parent object.
+    """
+    COUNT = 100
+    # Chunks per worker process, smaller chunks show up sooner
+    CHUNKS_PER_WORKER = 4
+
+    thumbnailReady = QtCore.Signal(int, object)
+    failed = QtCore.Signal(str)
+
+    def __init__(self, filePath, frameCount, cacheDirectory, count=COUNT,
+                 height=videoFn.THUMBNAIL_HEIGHT, workers=None, parent=None):
+        super(ThumbnailWorker, self).__init__(parent)
+        self.filePath = filePath
+        self.frameCount = frameCount
+        self.cacheDirectory = cacheDirectory
+        self.count = count
+        self.height = height
+        self.workers = workers or multiprocessing.cpu_count()
+        self._cancelEvent = threading.Event()
+
+    def cancel(self):
+        self._cancelEvent.set()
+
+    def isCancelled(self):
+        return self._cancelEvent.is_set()
+
+    def thumbnailPath(self, frame):
+        return os.path.join(self.cacheDirectory, f"{frame}_{self.height}.jpg")
+
+    def run(self):
+        missing = []
+        for frame in videoFn.thumbnailFrames(self.frameCount, self.count):
+            if self.isCancelled():
+                return
+            path = self.thumbnailPath(frame)
+            if os.path.isfile(path):
+                image = QtGui.QImage(path)
+                if not image.isNull():
+                    self.thumbnailReady.emit(frame, image)
+                    continue
+            missing.append(frame)
+        if not missing:
+            return
+
+        chunkCount = min(len(missing), self.workers * self.CHUNKS_PER_WORKER)
+        # Interleaved chunks spread first results across the whole clip
+        chunks = [missing[index::chunkCount] for index in range(chunkCount)]
+        try:
+            processes = min(self.workers, chunkCount)
+            with concurrent.futures.ProcessPoolExecutor(processes) as executor:
+                futures = [
+                    executor.submit(
+                        videoFn.decodeThumbnails, self.filePath, chunk,
+                        self.height)
+                    for chunk in chunks]
+                for future in concurrent.futures.as_completed(futures):
+                    if self.isCancelled():
+                        for pending in futures:
+                            pending.cancel()
+                        return
+                    for frame, data in future.result():
+                        self.storeThumbnail(frame, data)
+        except Exception:
+            logger.exception(
+                "Failed to generate thumbnails of {0}".format(self.filePath),
+                exc_info=1)
+            self.failed.emit(self.filePath)
+
+    def storeThumbnail(self, frame, data):
+        try:
+            with open(self.thumbnailPath(frame), "wb") as thumbnailFile:
+                thumbnailFile.write(data)
+        except OSError:
+            logger.warning(
+                f"Failed to cache thumbnail {frame} of {self.filePath}")
+        image = QtGui.QImage.fromData(data, "JPG")
+        if not image.isNull():
+            self.thumbnailReady.emit(frame, image)
@@ -0,0 +1,671 @@
+import os
+import array
+import heapq
+import logging
+import fractions
+import multiprocessing
+import concurrent.futures
+from scripts import lazyImport
+
+# Imported on first use, loading OpenCV is a large part of start up time
+cv2 = lazyImport.LazyModule("cv2")
+# PyAV gives packet level access to the container, without it frames have to be
+# decoded to be counted
+av = lazyImport.LazyModule("av") if lazyImport.isAvailable("av") else None
+
+# Logger
+logger = logging.getLogger(__name__)
+
+MIN_SEGMENT_SECONDS = 10.0
+# Packets counted between progress updates and cancellation checks
+PROGRESS_STEP = 250
+# Packets sampled to tell constant from variable frame rate
+FRAME_RATE_SAMPLE = 240
+# Height of filmstrip thumbnails in pixels
+THUMBNAIL_HEIGHT = 48
+# Frames closer than this are read through instead of seeking
+THUMBNAIL_SEEK_GAP = 30
+# Set in frame counting worker processes
+_workerCounter = None
+_workerCancelEvent = None
+
+
+class Cancelled(Exception):
+    """Raised when long running operation was cancelled through cancelEvent."""
+
+
+class ProbeCancelled(Cancelled):
+    """Raised when probing was cancelled through cancelEvent."""
+
+
+class UntimedPacket(Exception):
+    """Raised when segment scan meets packet without pts and dts.
+
+    Segment such packet belongs to can't be told.
+    """
+
+
+def probe(filePath, workers=None, progress=None, cancelEvent=None):
+    """Read video metadata, counting frames if container does not store them.
+
+    Packets are only scanned when frame count is missing or frame rate is
+    variable, for other videos metadata is read from the header and the
+    keyframe index is left to indexKeyframes.
+
+    Args:
+        filePath (str): Path to video file.
+        workers (int, optional): Max number of frame counting processes.
+            Defaults to cpu count.
+        progress (callable, optional): Called with number of frames counted so
+            far.
+        cancelEvent (multiprocessing.Event, optional): Set to stop counting and
+            raise ProbeCancelled.
+
+    Returns:
+        dict: frameCount, duration (seconds), frameRate ("num/den" string),
+            variableFrameRate, timeBase ("num/den" string), resolution (width,
+            height), timestamps - per frame presentation time index (see
+            timestampIndex) and keyframes - keyframe index (see keyframeIndex),
+            both built only if frame count is missing or frame rate is
+            variable. Indices are None when not built.
+    """
+    capture = cv2.VideoCapture(filePath)
+    if not capture.isOpened():
+        raise IOError("Failed to open video file {0}".format(filePath))
+    frames = int(capture.get(cv2.CAP_PROP_FRAME_COUNT))
+    frameRate = rationalFrameRate(capture.get(cv2.CAP_PROP_FPS))
+    variableFrameRate = False
+    timeBase = None
+    resolution = (
+        int(capture.get(cv2.CAP_PROP_FRAME_WIDTH)),
+        int(capture.get(cv2.CAP_PROP_FRAME_HEIGHT)))
+    capture.release()
+
+    if av is not None:
+        streamRate, variableFrameRate, timeBase = probeFrameRate(filePath)
+        frameRate = streamRate or frameRate
+
+    timestamps = None
+    keyframes = None
+    if av is None:
+        if frames <= 0:
+            logger.warning(
+                "Failed to get frame count from meta data, counting decoded "
+                "frames...")
+            frames = countDecodedFrames(
+                filePath, progress=progress, cancelEvent=cancelEvent)
+    elif frames <= 0 or variableFrameRate:
+        # Constant rate math can't map VFR frames to time, index every frame
+        # instead
+        packets = scanPackets(
+            filePath, workers=workers, progress=progress,
+            cancelEvent=cancelEvent)
+        frames = len(packets)
+        timestamps = timestampIndex(packets, timeBase)
+        # Packets are read anyway
+        keyframes = keyframeIndex(packets)
+
+    duration = float(frames / frameRate) if frameRate else None
+    if timestamps:
+        frameDuration = 1000000 / frameRate if frameRate else 0
+        duration = float(timestamps[-1] + frameDuration) / 1000000
+
+    return {"frameCount": frames,
+            "duration": duration,
+            "frameRate": str(frameRate) if frameRate else None,
+            "variableFrameRate": variableFrameRate,
+            "timeBase": str(timeBase) if timeBase else None,
+            "resolution": resolution,
+            "timestamps": timestamps,
+            "keyframes": keyframes}
+
+
+def rationalFrameRate(rate):
+    """Convert frame rate to exact fraction.
+
+    NTSC style rates reported as floats (23.976023976...) are snapped to
+    n/1001.
+
+    Args:
+        rate (float or Fraction): Frame rate.
+
+    Returns:
+        fractions.Fraction: Frame rate or None if rate is unknown.
+    """
+    if not rate or rate <= 0:
+        return None
+    exact = fractions.Fraction(rate)
+    ntsc = fractions.Fraction(
+        round(exact * fractions.Fraction(1001, 1000)) * 1000, 1001)
+    if abs(ntsc - exact) <= exact * fractions.Fraction(1, 10 ** 4):
+        return ntsc
+    snapped = exact.limit_denominator(1001)
+    if abs(snapped - exact) <= exact * fractions.Fraction(1, 10 ** 6):
+        return snapped
+    return exact
+
+
+def probeFrameRate(filePath):
+    """Read frame rate and time base of the first video stream.
+
+    Rate is taken from the stream and checked against timestamps of first
+    packets, which also tells if the stream has variable frame rate.
+
+    Args:
+        filePath (str): Path to video file.
+
+    Returns:
+        tuple: (frame rate, variable frame rate flag, time base), rates are
+            Fractions or None.
+    """
+    with av.open(filePath) as container:
+        stream = container.streams.video[0]
+        timeBase = stream.time_base
+        rate = rationalFrameRate(stream.guessed_rate or stream.average_rate)
+        timestamps = []
+        for packet in container.demux(stream):
+            if packet.size and packet.pts is not None:
+                timestamps.append(packet.pts)
+            if len(timestamps) >= FRAME_RATE_SAMPLE:
+                break
+
+    timestamps.sort()
+    deltas = [b - a for a, b in zip(timestamps, timestamps[1:])]
+    if not deltas or not timeBase:
+        return rate, False, timeBase
+
+    measured = rationalFrameRate(
+        1 / (fractions.Fraction(sum(deltas), len(deltas)) * timeBase))
+    if rate is None:
+        rate = measured
+    # Frame duration in stream ticks, timestamps are allowed to be rounded by
+    # one tick
+    expected = 1 / (rate * timeBase)
+    tolerance = max(1, expected / 20)
+    variable = any(abs(delta - expected) > tolerance for delta in deltas)
+    return rate, variable, timeBase
+
+
+def countFrames(filePath, workers=None):
+    """Get number of frames in video file.
+
+    Frame count stored in container metadata is used if present. Otherwise
+    video packets are counted without decoding them, split into time segments
+    counted in parallel worker processes.
+
+    Args:
+        filePath (str): Path to video file.
+        workers (int, optional): Max number of worker processes. Defaults to
+            cpu count.
+
+    Returns:
+        int: Number of frames.
+    """
+    capture = cv2.VideoCapture(filePath)
+    if not capture.isOpened():
+        raise IOError("Failed to open video file {0}".format(filePath))
+    frames = int(capture.get(cv2.CAP_PROP_FRAME_COUNT))
+    capture.release()
+    if frames > 0:
+        return frames
+
+    logger.warning(
+        "Failed to get frame count from meta data, counting frames...")
+    if av is None:
+        return countDecodedFrames(filePath)
+    return countPackets(filePath, workers=workers)
+
+
+def countDecodedFrames(filePath, progress=None, cancelEvent=None):
+    """Count frames by grabbing every frame with OpenCV.
+
+    Frames are decoded but never retrieved or color converted.
+    """
+    capture = cv2.VideoCapture(filePath)
+    frames = 0
+    try:
+        while capture.grab():
+            frames += 1
+            if frames % PROGRESS_STEP == 0:
+                if cancelEvent is not None and cancelEvent.is_set():
+                    raise ProbeCancelled(filePath)
+                if progress:
+                    progress(frames)
+    finally:
+        capture.release()
+    return frames
+
+
+def countPackets(filePath, workers=None, progress=None, cancelEvent=None):
+    """Count video packets without decoding them.
+
+    Packets are counted in parallel when container can seek.
+
+    Args:
+        filePath (str): Path to video file.
+        workers (int, optional): Max number of worker processes. Defaults to
+            cpu count.
+        progress (callable, optional): Called with number of frames counted so
+            far.
+        cancelEvent (multiprocessing.Event, optional): Set to stop counting and
+            raise ProbeCancelled.
+
+    Returns:
+        int: Number of frames.
+    """
+    return len(scanPackets(
+        filePath, workers=workers, progress=progress, cancelEvent=cancelEvent))
+
+
+def scanPackets(filePath, workers=None, progress=None, cancelEvent=None):
+    """Read presentation timestamps of all video packets without decoding them.
+
+    Same arguments as countPackets.
+
+    Returns:
+        list: (pts, keyframe flag) of every packet in decode order, pts is in
+            stream time base or None if packet has no timestamp.
+    """
+    segments = splitSegments(filePath, workers or os.cpu_count() or 1)
+    counter = multiprocessing.Value("q", 0)
+    if cancelEvent is None:
+        cancelEvent = multiprocessing.Event()
+
+    if len(segments) == 1:
+        timestamps = _scanSegment(
+            filePath, segments[0][0], segments[0][1], counter, cancelEvent,
+            progress)
+    else:
+        with concurrent.futures.ProcessPoolExecutor(
+                max_workers=len(segments), initializer=_initCountWorker,
+                initargs=(counter, cancelEvent)) as executor:
+            futures = [
+                executor.submit(_scanSegmentWorker, filePath, start, end)
+                for start, end in segments]
+            pending = futures
+            while pending:
+                _, pending = concurrent.futures.wait(pending, timeout=0.1)
+                if progress:
+                    progress(counter.value)
+            try:
+                timestamps = [
+                    pts for future in futures for pts in future.result()]
+            except UntimedPacket:
+                timestamps = None
+        if timestamps is None:
+            logger.warning(
+                "Packets without timestamps can't be split into segments, "
+                "scanning in a single pass")
+            with counter.get_lock():
+                counter.value = 0
+            timestamps = _scanSegment(
+                filePath, None, None, counter, cancelEvent, progress)
+
+    if cancelEvent.is_set():
+        raise ProbeCancelled(filePath)
+    return timestamps
+
+
+def indexKeyframes(filePath, workers=None, progress=None, cancelEvent=None):
+    """Build keyframe index of a video by scanning its packets, requires PyAV.
+
+    Same arguments as countPackets.
+
+    Returns:
+        array.array: Keyframe index (see keyframeIndex).
+    """
+    return keyframeIndex(scanPackets(
+        filePath, workers=workers, progress=progress, cancelEvent=cancelEvent))
+
+
+def timestampIndex(packets, timeBase):
+    """Build per frame presentation time index.
+
+    Args:
+        packets (list): Packets as returned by scanPackets.
+        timeBase (Fraction): Stream time base.
+
+    Returns:
+        array.array: Sorted presentation times in microseconds relative to the
+            first frame, None if some packets have no timestamp.
+    """
+    ordered = sorted(pts for pts, keyframe in packets if pts is not None)
+    if not ordered or not timeBase or len(ordered) != len(packets):
+        return None
+    first = ordered[0]
+    scale = timeBase * 1000000
+    return array.array("q", (int((pts - first) * scale) for pts in ordered))
+
+
+def keyframeIndex(packets):
+    """Build index of keyframes in presentation order.
+
+    Args:
+        packets (list): Packets as returned by scanPackets.
+
+    Returns:
+        array.array: Sorted frame numbers of keyframes, None if some packets
+            have no timestamp.
+    """
+    if not packets or any(pts is None for pts, keyframe in packets):
+        return None
+    ordered = sorted(packets)
+    return array.array("q", (frame for frame, (pts, keyframe)
+                             in enumerate(ordered) if keyframe))
+
+
+def splitSegments(filePath, count):
+    """Split video stream into time segments of roughly equal length.
+
+    Args:
+        filePath (str): Path to video file.
+        count (int): Max number of segments.
+
+    Returns:
+        list: (start, end) pairs in stream time base, None marks open end.
+    """
+    with av.open(filePath) as container:
+        stream = container.streams.video[0]
+        start, end = _streamTimeRange(container, stream)
+
+    if start is None or end is None or end <= start:
+        return [(None, None)]
+
+    seconds = float((end - start) * stream.time_base)
+    count = int(max(1, min(count, seconds // MIN_SEGMENT_SECONDS)))
+    bounds = [
+        start + (end - start) * index // count for index in range(count + 1)]
+    segments = list(zip(bounds[:-1], bounds[1:]))
+    # Open ends so packets outside of estimated range are still counted
+    segments[0] = (None, segments[0][1])
+    segments[-1] = (segments[-1][0], None)
+    return segments
+
+
+def _streamTimeRange(container, stream):
+    """First and last packet timestamps of the stream, None if unknown."""
+    start = None
+    for packet in container.demux(stream):
+        if packet.pts is not None:
+            start = packet.pts
+            break
+    if start is None:
+        return None, None
+
+    if stream.duration:
+        return start, start + stream.duration
+    if container.duration:
+        duration = container.duration / av.time_base / stream.time_base
+        return start, start + int(duration)
+
+    # No duration in container, find last keyframe and read packets after it
+    end = None
+    try:
+        container.seek(2 ** 62, backward=True, any_frame=False, stream=stream)
+        for packet in container.demux(stream):
+            if packet.pts is not None:
+                end = packet.pts if end is None else max(end, packet.pts)
+    except av.AVError:
+        logger.warning("Failed to seek to the end of stream")
+        return start, None
+
+    return start, end
+
+
+def _initCountWorker(counter, cancelEvent):
+    global _workerCounter
+    global _workerCancelEvent
+    _workerCounter = counter
+    _workerCancelEvent = cancelEvent
+
+
+def _scanSegmentWorker(filePath, start, end):
+    return _scanSegment(
+        filePath, start, end, _workerCounter, _workerCancelEvent)
+
+
+def _scanSegment(filePath, start, end, counter, cancelEvent, progress=None):
+    """Read timestamps and keyframe flags of first video stream packets.
+
+    Only packets with pts in [start, end) are read, packets without pts are
+    placed by dts. Number of read packets is added to shared counter, reading
+    stops early when cancelEvent is set.
+
+    Raises:
+        UntimedPacket: Packet has neither pts nor dts and range is not open on
+            both ends.
+    """
+    timestamps = []
+    reported = 0
+    with av.open(filePath) as container:
+        stream = container.streams.video[0]
+        if start is not None:
+            container.seek(
+                start, backward=True, any_frame=False, stream=stream)
+        for packet in container.demux(stream):
+            # Empty packet is sent when demuxer is flushed
+            if not packet.size:
+                continue
+            # Decode order: once dts passed the segment all remaining pts are
+            # past it too
+            dts = packet.dts
+            if end is not None and dts is not None and dts >= end:
+                break
+            # Packets without pts are placed into segments by dts, so every
+            # segment split counts them the same
+            timestamp = packet.pts if packet.pts is not None else packet.dts
+            if timestamp is None:
+                if start is None and end is None:
+                    timestamps.append((None, packet.is_keyframe))
+                    continue
+                raise UntimedPacket(filePath)
+            if start is not None and timestamp < start:
+                continue
+            if end is not None and timestamp >= end:
+                continue
+            timestamps.append((packet.pts, packet.is_keyframe))
+            frames = len(timestamps)
+            if frames - reported >= PROGRESS_STEP:
+                with counter.get_lock():
+                    counter.value += frames - reported
+                reported = frames
+                if cancelEvent.is_set():
+                    break
+                if progress:
+                    progress(counter.value)
+
+    with counter.get_lock():
+        counter.value += len(timestamps) - reported
+    return timestamps
+
+
+def generateProxy(filePath, proxyPath, frameRate, maxWidth=960, progress=None,
+                  cancelEvent=None):
+    """Write reduced resolution intra-only (MJPEG) copy of the video for scrubbing.
+
+    Every source frame is written exactly once and in order, so frame numbers
+    of the proxy match the source. Audio of the source is muxed into the proxy
+    when PyAV is available, without it proxy has no audio. Proxy is written to
+    a temporary file and moved into place only when complete.
+
+    Args:
+        filePath (str): Path to source video.
+        proxyPath (str): Path of proxy to write, must have .avi extension.
+        frameRate (Fraction): Frame rate of the source.
+        maxWidth (int, optional): Max proxy width, source is never upscaled.
+        progress (callable, optional): Called with number of frames written so
+            far.
+        cancelEvent (threading.Event, optional): Set to stop and raise
+            Cancelled.
+
+    Returns:
+        int: Number of frames written.
+    """
+    capture = cv2.VideoCapture(filePath)
+    if not capture.isOpened():
+        raise IOError("Failed to open video file {0}".format(filePath))
+    width = int(capture.get(cv2.CAP_PROP_FRAME_WIDTH))
+    height = int(capture.get(cv2.CAP_PROP_FRAME_HEIGHT))
+    scale = min(1.0, maxWidth / width)
+    # Even dimensions keep codecs happy
+    size = (int(width * scale) // 2 * 2, int(height * scale) // 2 * 2)
+
+    tempPath = os.path.splitext(proxyPath)[0] + ".part.avi"
+    writer = cv2.VideoWriter(
+        tempPath, cv2.VideoWriter_fourcc(*"MJPG"), float(frameRate), size)
+    if not writer.isOpened():
+        capture.release()
+        raise IOError("Failed to create proxy file {0}".format(tempPath))
+
+    frames = 0
+    try:
+        while True:
+            success, image = capture.read()
+            if not success:
+                break
+            if size != (width, height):
+                image = cv2.resize(image, size, interpolation=cv2.INTER_AREA)
+            writer.write(image)
+            frames += 1
+            if frames % PROGRESS_STEP == 0:
+                if cancelEvent is not None and cancelEvent.is_set():
+                    raise Cancelled(filePath)
+                if progress:
+                    progress(frames)
+    except BaseException:
+        writer.release()
+        os.remove(tempPath)
+        raise
+    finally:
+        capture.release()
+
+    writer.release()
+    if av is not None and hasAudio(filePath):
+        audioPath = os.path.splitext(proxyPath)[0] + ".audio.part.avi"
+        try:
+            muxAudio(tempPath, filePath, audioPath)
+        except Exception:
+            logger.exception(
+                "Failed to add audio to proxy of {0}".format(filePath),
+                exc_info=1)
+            if os.path.isfile(audioPath):
+                os.remove(audioPath)
+        else:
+            os.replace(audioPath, tempPath)
+    os.replace(tempPath, proxyPath)
+    return frames
+
+
+def hasAudio(filePath):
+    """Check if file has an audio stream.
+
+    Returns:
+        bool: True if it has, None if it can't be told without PyAV.
+    """
+    if av is None:
+        return None
+    with av.open(filePath) as container:
+        return bool(container.streams.audio)
+
+
+def muxAudio(videoPath, audioPath, outputPath):
+    """Write AVI with video of videoPath and first audio stream of audioPath.
+
+    Video packets are copied as they are, audio is converted to PCM which
+    AVI and every media backend support. Packets of both streams are
+    interleaved by time. Requires PyAV.
+    """
+    with av.open(videoPath) as video, av.open(audioPath) as audio, \
+            av.open(outputPath, "w", format="avi") as output:
+        videoIn = video.streams.video[0]
+        audioIn = audio.streams.audio[0]
+        videoOut = output.add_stream(template=videoIn)
+        audioOut = output.add_stream("pcm_s16le", rate=audioIn.rate)
+        audioOut.layout = audioIn.layout.name
+
+        def videoPackets():
+            for packet in video.demux(videoIn):
+                # Empty packet is sent when demuxer is flushed
+                if packet.size:
+                    packet.stream = videoOut
+                    yield packet
+
+        def audioPackets():
+            for frame in audio.decode(audioIn):
+                for packet in audioOut.encode(frame):
+                    yield packet
+            for packet in audioOut.encode(None):
+                yield packet
+
+        for packet in heapq.merge(videoPackets(), audioPackets(),
+                                  key=_packetTime):
+            output.mux(packet)
+
+
+def _packetTime(packet):
+    timestamp = packet.dts if packet.dts is not None else packet.pts
+    if timestamp is None:
+        return 0.0
+    return float(timestamp * packet.time_base)
+
+
+def thumbnailFrames(frameCount, count):
+    """Frames evenly sampled across the video, each from the middle of its span.
+
+    Args:
+        frameCount (int): Number of frames in the video.
+        count (int): Number of thumbnails.
+
+    Returns:
+        list: Sorted unique frame numbers.
+    """
+    count = min(count, frameCount)
+    return sorted(set(
+        (2 * index + 1) * frameCount // (2 * count) for index in range(count)))
+
+
+def decodeThumbnails(filePath, frames, height=THUMBNAIL_HEIGHT):
+    """Decode frames and encode them as small JPEG thumbnails.
+
+    Picklable results make this suitable for running in a process pool.
+
+    Args:
+        filePath (str): Path to video file.
+        frames (list): Frame numbers in increasing order.
+        height (int, optional): Thumbnail height, width keeps aspect ratio.
+
+    Returns:
+        list: (frame, JPEG bytes) pairs, frames that failed to decode are
+            skipped.
+    """
+    capture = cv2.VideoCapture(filePath)
+    if not capture.isOpened():
+        raise IOError("Failed to open video file {0}".format(filePath))
+
+    thumbnails = []
+    position = 0
+    try:
+        for frame in frames:
+            # Sequential reads are cheaper than seeking to a nearby frame
+            if frame < position or frame - position > THUMBNAIL_SEEK_GAP:
+                capture.set(cv2.CAP_PROP_POS_FRAMES, frame)
+                position = frame
+            while position < frame and capture.grab():
+                position += 1
+            success, image = capture.read()
+            position += 1
+            if not success:
+                logger.warning(
+                    "Failed to decode frame {0} of {1}".format(
+                        frame, filePath))
+                continue
+            width = max(1, image.shape[1] * height // image.shape[0])
+            image = cv2.resize(
+                image, (width, height), interpolation=cv2.INTER_AREA)
+            success, data = cv2.imencode(".jpg", image)
+            if success:
+                thumbnails.append((frame, data.tobytes()))
+    finally:
+        capture.release()
+
+    return thumbnails
@@ -0,0 +1,81 @@
+import unittest
+from scripts.frameCache import FrameCache
+
+MB = 1024 * 1024
+
+
+class FakeFrame(object):
+    """Stands in for numpy.ndarray, cache only needs size and write flag."""
+
+    def __init__(self, nbytes):
+        self.nbytes = nbytes
+        self.writeable = True
+
+    def setflags(self, write):
+        self.writeable = write
+
+
+class FrameCacheTest(unittest.TestCase):
+
+    def testFramesAreReadOnly(self):
+        cache = FrameCache(1)
+        frame = FakeFrame(10)
+        cache.put(0, frame)
+        self.assertIs(cache.get(0), frame)
+        self.assertFalse(frame.writeable)
+
+    def testEvictsLeastRecentlyUsed(self):
+        cache = FrameCache(3)
+        for key in range(3):
+            cache.put(key, FakeFrame(MB))
+        # Frame 0 becomes most recently used
+        cache.get(0)
+        cache.put(3, FakeFrame(MB))
+        self.assertIn(0, cache)
+        self.assertNotIn(1, cache)
+        self.assertEqual(cache.size, 3 * MB)
+        self.assertEqual(cache.evictions, 1)
+
+    def testFrameOverBudgetIsNotCached(self):
+        cache = FrameCache(1)
+        cache.put(0, FakeFrame(MB // 2))
+        cache.put(1, FakeFrame(2 * MB))
+        self.assertNotIn(1, cache)
+        self.assertIn(0, cache)
+
+    def testReplacedFrameIsNotCountedTwice(self):
+        cache = FrameCache(2)
+        cache.put(0, FakeFrame(MB))
+        cache.put(0, FakeFrame(MB))
+        self.assertEqual(len(cache), 1)
+        self.assertEqual(cache.size, MB)
+
+    def testSetBudgetEvicts(self):
+        cache = FrameCache(4)
+        for key in range(4):
+            cache.put(key, FakeFrame(MB))
+        cache.setBudget(2)
+        self.assertEqual(len(cache), 2)
+        self.assertEqual(cache.size, 2 * MB)
+        self.assertNotIn(0, cache)
+
+    def testStats(self):
+        cache = FrameCache(1)
+        self.assertIsNone(cache.stats()["hitRate"])
+        cache.put(0, FakeFrame(10))
+        cache.get(0)
+        cache.get(1)
+        stats = cache.stats()
+        self.assertEqual((stats["hits"], stats["misses"]), (1, 1))
+        self.assertEqual(stats["hitRate"], 0.5)
+
+    def testClear(self):
+        cache = FrameCache(1)
+        cache.put(0, FakeFrame(10))
+        cache.clear()
+        self.assertEqual(len(cache), 0)
+        self.assertEqual(cache.size, 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,58 @@
+import sys
+import json
+import threading
+import unittest
+from scripts import lazyImport
+
+
+class LazyModuleTest(unittest.TestCase):
+
+    def testImportedOnFirstAccess(self):
+        name = "xml.dom.minidom"
+        sys.modules.pop(name, None)
+        module = lazyImport.LazyModule(name)
+        self.assertNotIn(name, sys.modules)
+        self.assertFalse(module._isLoaded())
+        self.assertIs(module.parseString, sys.modules[name].parseString)
+        self.assertTrue(module._isLoaded())
+
+    def testModuleAttributesAreNotShadowed(self):
+        # json.load, like numpy.load, has the name of a loader method
+        module = lazyImport.LazyModule("json")
+        self.assertIs(module.load, json.load)
+        self.assertIs(module.loads, json.loads)
+
+    def testMissingAttribute(self):
+        module = lazyImport.LazyModule("json")
+        with self.assertRaises(AttributeError):
+            module.missingAttribute
+
+    def testConcurrentFirstAccess(self):
+        module = lazyImport.LazyModule("json")
+        results = []
+        threads = [
+            threading.Thread(target=lambda: results.append(module.dumps))
+            for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(results, [json.dumps] * 8)
+
+    def testIsAvailable(self):
+        self.assertTrue(lazyImport.isAvailable("json"))
+        self.assertFalse(lazyImport.isAvailable("missingModule"))
+        self.assertFalse(lazyImport.isAvailable("missingPackage.module"))
+
+
+class WarmUpTest(unittest.TestCase):
+
+    def testSkipsMissingModules(self):
+        timings = []
+        thread = lazyImport.warmUp(["json", "missingModule"], timings.append)
+        thread.join(5)
+        self.assertEqual(list(timings[0]), ["json"])
+
+
+if __name__ == "__main__":
+    unittest.main()
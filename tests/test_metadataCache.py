@@ -0,0 +1,73 @@
+import os
+import array
+import shutil
+import tempfile
+import unittest
+from scripts.metadataCache import MetadataCache
+
+
+class MetadataCacheTest(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.videoPath = os.path.join(self.directory, "clip.mov")
+        self.writeVideo(b"frames")
+
+    def tearDown(self):
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+    def writeVideo(self, data):
+        with open(self.videoPath, "wb") as videoFile:
+            videoFile.write(data)
+
+    def testMissingFile(self):
+        cache = MetadataCache(self.directory)
+        missingPath = os.path.join(self.directory, "missing.mov")
+        self.assertIsNone(cache.fileKey(missingPath))
+        self.assertIsNone(cache.get(missingPath))
+
+    def testPersistsBetweenInstances(self):
+        MetadataCache(self.directory).put(self.videoPath, {"frameCount": 10})
+        cache = MetadataCache(self.directory)
+        self.assertEqual(cache.get(self.videoPath), {"frameCount": 10})
+
+    def testChangedFileIsMissed(self):
+        cache = MetadataCache(self.directory)
+        cache.put(self.videoPath, {"frameCount": 10})
+        self.writeVideo(b"longer frames")
+        self.assertIsNone(cache.get(self.videoPath))
+        # Entry of the old file is replaced, not kept next to the new one
+        cache.put(self.videoPath, {"frameCount": 20})
+        self.assertEqual(len(cache.entries), 1)
+
+    def testOtherVersionIsDiscarded(self):
+        cache = MetadataCache(self.directory)
+        cache.put(self.videoPath, {"frameCount": 10})
+        cache.VERSION = MetadataCache.VERSION + 1
+        cache.save()
+        self.assertIsNone(MetadataCache(self.directory).get(self.videoPath))
+
+    def testOldestEntriesAreDropped(self):
+        cache = MetadataCache(self.directory)
+        cache.MAX_ENTRIES = 2
+        paths = []
+        for index in range(3):
+            path = os.path.join(self.directory, f"clip{index}.mov")
+            with open(path, "wb") as videoFile:
+                videoFile.write(b"frames")
+            cache.put(path, {"frameCount": index})
+            paths.append(path)
+        self.assertIsNone(cache.get(paths[0]))
+        self.assertEqual(cache.get(paths[2]), {"frameCount": 2})
+
+    def testArrayRoundTrip(self):
+        cache = MetadataCache(self.directory)
+        values = array.array("q", [0, 41708, 83417])
+        cache.writeArray(self.videoPath, "timestamps", values)
+        self.assertEqual(
+            cache.readArray(self.videoPath, "timestamps", "q"), values)
+        self.assertIsNone(cache.readArray(self.videoPath, "keyframes", "q"))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,67 @@
+import array
+import fractions
+import unittest
+from scripts.playbackClock import PlaybackClock
+
+SECOND = 1000000000
+
+
+class PlaybackClockTest(unittest.TestCase):
+
+    def testRequiresRateOrTimestamps(self):
+        with self.assertRaises(ValueError):
+            PlaybackClock(None)
+
+    def testStopped(self):
+        clock = PlaybackClock(fractions.Fraction(24))
+        self.assertFalse(clock.isRunning())
+        self.assertIsNone(clock.timeOfFrame(5))
+        self.assertEqual(clock.frameAt(SECOND), 0)
+
+    def testNoDriftOverLongPlayback(self):
+        clock = PlaybackClock(fractions.Fraction(24000, 1001))
+        clock.start(0, now=0)
+        # 24000 frames take exactly 1001 seconds
+        self.assertEqual(clock.timeOfFrame(24000), 1001 * SECOND)
+        self.assertEqual(clock.frameAt(1001 * SECOND), 24000)
+        self.assertEqual(clock.frameAt(1001 * SECOND - 1), 23999)
+
+    def testFrameIsNotDueEarly(self):
+        clock = PlaybackClock(fractions.Fraction(30000, 1001))
+        clock.start(100, now=5 * SECOND)
+        for frame in range(100, 1000):
+            due = clock.timeOfFrame(frame)
+            self.assertEqual(clock.frameAt(due), frame)
+            self.assertEqual(clock.frameAt(due - 1), frame - 1)
+
+    def testTimerDefault(self):
+        now = [0]
+        clock = PlaybackClock(fractions.Fraction(25), timer=lambda: now[0])
+        clock.start(10)
+        now[0] = 2 * SECOND
+        self.assertEqual(clock.frameAt(), 60)
+        clock.stop()
+        self.assertFalse(clock.isRunning())
+
+    def testTimestamps(self):
+        timestamps = array.array("q", [0, 40000, 100000, 120000])
+        clock = PlaybackClock(None, timestamps)
+        clock.start(1, now=0)
+        # Times are relative to frame clock was started from
+        self.assertEqual(clock.timeOfFrame(2), 60000 * 1000)
+        self.assertEqual(clock.frameAt(59999 * 1000), 1)
+        self.assertEqual(clock.frameAt(60000 * 1000), 2)
+        # Never before start frame
+        self.assertEqual(clock.frameAt(-SECOND), 1)
+
+    def testPastLastTimestamp(self):
+        timestamps = array.array("q", [0, 40000, 80000])
+        clock = PlaybackClock(fractions.Fraction(25), timestamps)
+        clock.start(0, now=0)
+        # Frames after the index last one frame duration each
+        self.assertEqual(clock.frameAt(160000 * 1000), 4)
+        self.assertEqual(clock.timeOfFrame(4), 160000 * 1000)
+
+
+if __name__ == "__main__":
+    unittest.main()
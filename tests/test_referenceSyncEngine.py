@@ -0,0 +1,63 @@
+import array
+import fractions
+import unittest
+from scripts.referenceSyncEngine import VideoMeta
+
+
+def videoMeta(frameCount, frameRate=None, duration=None, timestamps=None):
+    meta = VideoMeta()
+    meta.frameCount = frameCount
+    meta.frameRate = frameRate
+    meta.duration = duration
+    meta.timestamps = timestamps
+    return meta
+
+
+class VideoMetaTest(unittest.TestCase):
+
+    def assertRoundTrip(self, meta):
+        for frame in range(meta.frameCount):
+            position = meta.frameToPosition(frame)
+            self.assertEqual(meta.positionToFrame(position), frame)
+            # Frame is not shown a millisecond earlier
+            if frame:
+                self.assertEqual(meta.positionToFrame(position - 1), frame - 1)
+
+    def testConstantRate(self):
+        for rate in (fractions.Fraction(24), fractions.Fraction(24000, 1001),
+                     fractions.Fraction(30000, 1001), fractions.Fraction(60)):
+            self.assertRoundTrip(videoMeta(2400, frameRate=rate))
+
+    def testConstantRateIsExact(self):
+        meta = videoMeta(100000, frameRate=fractions.Fraction(24000, 1001))
+        # Frame 24000 starts exactly at 1001 seconds
+        self.assertEqual(meta.frameToPosition(24000), 1001000)
+        self.assertEqual(meta.positionToFrame(1001000), 24000)
+        self.assertEqual(meta.positionToFrame(1000999), 23999)
+
+    def testTimestampIndex(self):
+        # Variable frame durations in microseconds
+        timestamps = array.array("q", [0, 41708, 83417, 150000, 166667])
+        meta = videoMeta(len(timestamps), timestamps=timestamps)
+        meta.variableFrameRate = True
+        self.assertRoundTrip(meta)
+        self.assertEqual(meta.positionToFrame(-5), 0)
+        self.assertEqual(meta.positionToFrame(10 ** 6), len(timestamps) - 1)
+
+    def testDurationFallback(self):
+        for frameCount, duration in ((2400, 100.1), (7, 0.3), (1000, 41.7)):
+            self.assertRoundTrip(videoMeta(frameCount, duration=duration))
+
+    def testFrameRateText(self):
+        self.assertEqual(videoMeta(1).frameRateText(), "")
+        self.assertEqual(
+            videoMeta(1, frameRate=fractions.Fraction(24)).frameRateText(),
+            "24 fps")
+        meta = videoMeta(1, frameRate=fractions.Fraction(24000, 1001))
+        self.assertEqual(meta.frameRateText(), "23.976 fps")
+        meta.variableFrameRate = True
+        self.assertEqual(meta.frameRateText(), "VFR ~23.976 fps")
+
+
+if __name__ == "__main__":
+    unittest.main()
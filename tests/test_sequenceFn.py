@@ -0,0 +1,66 @@
+import os
+import shutil
+import tempfile
+import unittest
+from scripts import sequenceFn
+
+
+class SplitFrameNumberTest(unittest.TestCase):
+
+    def testLastNumberIsFrame(self):
+        self.assertEqual(sequenceFn.splitFrameNumber("shot_v2_0101.exr"),
+                         ("shot_v2_", "0101", ".exr"))
+        self.assertEqual(sequenceFn.splitFrameNumber("shot.0101_beauty.png"),
+                         ("shot.", "0101", "_beauty.png"))
+
+    def testNoNumber(self):
+        self.assertIsNone(sequenceFn.splitFrameNumber("plate.png"))
+
+
+class DetectSequenceTest(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+    def touch(self, fileName):
+        path = os.path.join(self.directory, fileName)
+        open(path, "wb").close()
+        return path
+
+    def testFramesInNumberOrder(self):
+        paths = [self.touch(f"shot_{number}.png") for number in (10, 9, 11)]
+        # Other sequences and files in the directory are ignored
+        self.touch("shot_10.jpg")
+        self.touch("other_10.png")
+        os.mkdir(os.path.join(self.directory, "shot_12.png"))
+        numbers, found = sequenceFn.detectSequence(paths[0])
+        self.assertEqual(numbers, [9, 10, 11])
+        self.assertEqual(found, [paths[1], paths[0], paths[2]])
+
+    def testAnyPadding(self):
+        first = self.touch("shot_0099.png")
+        self.touch("shot_0100.png")
+        self.touch("shot_101.png")
+        numbers, _ = sequenceFn.detectSequence(first)
+        self.assertEqual(numbers, [99, 100, 101])
+
+    def testSingleFrame(self):
+        path = self.touch("plate.png")
+        self.assertEqual(sequenceFn.detectSequence(path), ([0], [path]))
+
+
+class FillGapsTest(unittest.TestCase):
+
+    def testGapsHoldPreviousFrame(self):
+        filled = sequenceFn.fillGaps([5, 6, 9, 10], ["a", "b", "c", "d"])
+        self.assertEqual(filled, ["a", "b", "b", "b", "c", "d"])
+
+    def testNoGaps(self):
+        self.assertEqual(sequenceFn.fillGaps([1, 2], ["a", "b"]), ["a", "b"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,74 @@
+import threading
+import unittest
+from unittest import mock
+from scripts.frameCache import FrameCache
+from scripts.sequenceReader import ImageSequenceReader
+from tests.test_frameCache import FakeFrame
+
+
+class ImageSequenceReaderTest(unittest.TestCase):
+
+    def setUp(self):
+        self.readPaths = []
+        patcher = mock.patch("scripts.sequenceReader.readImage",
+                             side_effect=self.readImage)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def readImage(self, path):
+        self.readPaths.append(path)
+        return FakeFrame(10)
+
+    def createReader(self, paths, **kwargs):
+        reader = ImageSequenceReader(paths, FrameCache(1), workers=2,
+                                     readAhead=0, **kwargs)
+        self.addCleanup(reader.close)
+        return reader
+
+    def testHeldFramesShareCacheEntry(self):
+        decoded = []
+        reader = self.createReader(["a", "a", "a", "b"],
+                                   onDecoded=decoded.append)
+        self.assertEqual([reader.sourceFrame(frame) for frame in range(4)],
+                         [0, 0, 0, 3])
+        image = reader.read(2)
+        self.assertIsNotNone(image)
+        self.assertIs(reader.peek(0), image)
+        self.assertIs(reader.read(1), image)
+        self.assertEqual(self.readPaths, ["a"])
+        self.assertEqual(decoded, [0])
+
+    def testPeekDoesNotDecode(self):
+        reader = self.createReader(["a", "b"])
+        self.assertIsNone(reader.peek(1))
+        self.assertIsNone(reader.peek(5))
+        self.assertEqual(self.readPaths, [])
+
+    def testPeekNearest(self):
+        reader = self.createReader(["a", "b", "c", "d", "e", "f"])
+        reader.read(1)
+        self.assertEqual(reader.peekNearest(3, distance=2)[0], 1)
+        self.assertEqual(reader.peekNearest(4, distance=2), (None, None))
+
+    def testClosedReaderDoesNotFillCache(self):
+        started = threading.Event()
+        release = threading.Event()
+
+        def readImage(path):
+            started.set()
+            release.wait(5)
+            return FakeFrame(10)
+
+        reader = self.createReader(["a"])
+        with mock.patch("scripts.sequenceReader.readImage",
+                        side_effect=readImage):
+            reader.prefetch(0)
+            self.assertTrue(started.wait(5))
+            reader.close()
+            release.set()
+            reader._executor.shutdown(wait=True)
+        self.assertNotIn(0, reader.cache)
+
+
+if __name__ == "__main__":
+    unittest.main()
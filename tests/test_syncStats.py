@@ -0,0 +1,70 @@
+import unittest
+from scripts.syncStats import LatencyHistogram, SyncStats
+
+
+class LatencyHistogramTest(unittest.TestCase):
+
+    def testEmpty(self):
+        histogram = LatencyHistogram()
+        self.assertIsNone(histogram.mean())
+        self.assertIsNone(histogram.percentile(50))
+        self.assertEqual(sum(count for _, count in histogram.buckets()), 0)
+
+    def testMinMaxMean(self):
+        histogram = LatencyHistogram()
+        for milliseconds in (3.0, 1.0, 2.0):
+            histogram.record(milliseconds)
+        self.assertEqual(histogram.minimum, 1.0)
+        self.assertEqual(histogram.maximum, 3.0)
+        self.assertEqual(histogram.mean(), 2.0)
+
+    def testPercentileIsBucketUpperBound(self):
+        histogram = LatencyHistogram()
+        for _ in range(99):
+            histogram.record(0.1)
+        histogram.record(5.0)
+        self.assertEqual(histogram.percentile(50), 0.25)
+        self.assertEqual(histogram.percentile(99), 0.25)
+        # Never above the slowest recorded latency
+        self.assertEqual(histogram.percentile(100), 5.0)
+
+    def testOverflowBucket(self):
+        histogram = LatencyHistogram()
+        histogram.record(60000.0)
+        bound, count = histogram.buckets()[-1]
+        self.assertEqual(bound, float("inf"))
+        self.assertEqual(count, 1)
+        self.assertEqual(histogram.percentile(50), 60000.0)
+
+    def testReset(self):
+        histogram = LatencyHistogram()
+        histogram.record(1.0)
+        histogram.reset()
+        self.assertEqual(histogram.count, 0)
+        self.assertIsNone(histogram.minimum)
+
+
+class SyncStatsTest(unittest.TestCase):
+
+    def testSnapshot(self):
+        stats = SyncStats()
+        stats.recordSent(10)
+        stats.recordSent(10)
+        stats.recordReply(4, 1.5)
+        stats.recordDropped(3)
+        stats.recordFailed()
+        data = stats.snapshot()
+        self.assertEqual(data["sent"], 2)
+        self.assertEqual(data["bytesOut"], 20)
+        self.assertEqual(data["bytesIn"], 4)
+        self.assertEqual(data["replies"], 1)
+        self.assertEqual(data["dropped"], 3)
+        self.assertEqual(data["failed"], 1)
+        self.assertEqual(data["rttMax"], 1.5)
+
+    def testSummaryWithoutReplies(self):
+        self.assertTrue(SyncStats().summary().startswith("RTT n/a"))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,65 @@
+import array
+import fractions
+import unittest
+from scripts import videoFn
+
+
+class RationalFrameRateTest(unittest.TestCase):
+
+    def testUnknown(self):
+        for rate in (None, 0, 0.0, -24.0):
+            self.assertIsNone(videoFn.rationalFrameRate(rate))
+
+    def testWholeRates(self):
+        for rate in (24, 25, 30, 60):
+            self.assertEqual(videoFn.rationalFrameRate(float(rate)),
+                             fractions.Fraction(rate))
+
+    def testNtscRates(self):
+        for numerator in (24000, 30000, 60000):
+            exact = fractions.Fraction(numerator, 1001)
+            for reported in (float(exact), round(float(exact), 3), exact):
+                self.assertEqual(videoFn.rationalFrameRate(reported), exact)
+
+    def testOtherRatesAreKept(self):
+        self.assertEqual(videoFn.rationalFrameRate(12.5),
+                         fractions.Fraction(25, 2))
+        self.assertEqual(videoFn.rationalFrameRate(fractions.Fraction(1, 3)),
+                         fractions.Fraction(1, 3))
+
+
+class TimestampIndexTest(unittest.TestCase):
+
+    def testSortedFromFirstFrame(self):
+        # Decode order, B-frames come after the frame they are shown before
+        packets = [(1000, True), (4000, False), (2000, False), (3000, False)]
+        index = videoFn.timestampIndex(packets, fractions.Fraction(1, 1000))
+        self.assertEqual(index, array.array("q", [0, 1000000, 2000000,
+                                                  3000000]))
+
+    def testPacketsWithoutTimestamp(self):
+        packets = [(0, True), (None, False)]
+        self.assertIsNone(
+            videoFn.timestampIndex(packets, fractions.Fraction(1, 1000)))
+        self.assertIsNone(videoFn.timestampIndex([], fractions.Fraction(1)))
+
+
+class ThumbnailFramesTest(unittest.TestCase):
+
+    def testMiddleOfEverySpan(self):
+        self.assertEqual(videoFn.thumbnailFrames(100, 4), [12, 37, 62, 87])
+
+    def testSpreadAcrossWholeClip(self):
+        frames = videoFn.thumbnailFrames(2400, 40)
+        self.assertEqual(len(frames), 40)
+        self.assertEqual(frames, sorted(frames))
+        self.assertLess(frames[0], 2400 // 40)
+        self.assertGreaterEqual(frames[-1], 2400 - 2400 // 40)
+
+    def testShortClip(self):
+        self.assertEqual(videoFn.thumbnailFrames(3, 10), [0, 1, 2])
+        self.assertEqual(videoFn.thumbnailFrames(0, 10), [])
+
+
+if __name__ == "__main__":
+    unittest.main()